@@ -0,0 +1,12 @@
+"""
+Performance benchmarks for the cake-cutting protocols.
+
+Run from the repository root:
+
+    python -m benchmarks                        # the quick profile
+    python -m benchmarks --profile full --json results.json --csv results.csv
+    python -m benchmarks --compare old.json new.json
+
+Programmer: agent
+Since: 2026-10
+"""
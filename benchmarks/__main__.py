@@ -0,0 +1,57 @@
+"""
+Command-line interface of the benchmarks. Run "python -m benchmarks --help" for the options.
+"""
+
+from benchmarks.cases import CASES
+from benchmarks import runner
+import argparse, fnmatch, logging, sys
+
+
+def main(argv=None)->int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of the cake-cutting protocols.")
+    parser.add_argument("--profile", choices=["quick", "full"], default="quick", help="which sizes to run (default: quick)")
+    parser.add_argument("--cases", default="*", help="a glob pattern of case names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per size; the minimum time is reported")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random agents")
+    parser.add_argument("--max-seconds", type=float, default=None, help="skip larger sizes of a case once a run takes longer")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--csv", help="write the results to this CSV file")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown factor that counts as a regression")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.list:
+        for case in CASES:
+            print(case)
+        return 0
+
+    if args.compare:
+        comparison = runner.compare(runner.load(args.compare[0]), runner.load(args.compare[1]), args.threshold)
+        for row in comparison:
+            print("{:60} {:>10} {:12.6f} {:12.6f} {:8.3f}{}".format(
+                row["case"], row["size"], row["old_seconds"], row["new_seconds"], row["ratio"],
+                "  REGRESSION" if row["regression"] else ""))
+        num_of_regressions = sum(row["regression"] for row in comparison)
+        print("{} regressions in {} results".format(num_of_regressions, len(comparison)))
+        return 1 if num_of_regressions > 0 else 0
+
+    cases = [case for case in CASES if fnmatch.fnmatch(case.name, args.cases)]
+    report = runner.run(cases, args.profile, args.repeat, args.seed, args.max_seconds)
+    for result in report["results"]:
+        print("{:60} {:>16} {:>10} {:12.6f}".format(result["case"], result["parameter"], result["size"], result["seconds"]))
+    for (case_name, exponent) in report["exponents"].items():
+        print("{:60} exponent {}".format(case_name, exponent))
+    if args.json:
+        runner.write_json(report, args.json)
+    if args.csv:
+        runner.write_csv(report, args.csv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
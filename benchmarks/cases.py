@@ -0,0 +1,137 @@
+"""
+The benchmark cases.
+
+Each case varies a single size parameter (number of agents, number of segments, 1/epsilon or simplex resolution)
+and keeps all other parameters fixed.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from benchmarks.populations import random_piecewise_constant_agents, random_piecewise_uniform_agents, random_exact_piecewise_constant_agents, random_piecewise_linear_agents, random_agent_population
+from fairpy.kernels import available_backends
+import numpy as np
+
+
+class Case:
+    """
+    A benchmark case.
+
+    :param name: a unique name.
+    :param parameter: the name of the size parameter ("agents", "segments", "1/epsilon" or "samples_per_side").
+    :param sizes: a dict that maps each profile name to a list of sizes.
+    :param setup: a function (size, rng) -> a function without arguments that runs the benchmarked code once.
+    """
+    def __init__(self, name:str, parameter:str, sizes:dict, setup):
+        self.name = name
+        self.parameter = parameter
+        self.sizes = sizes
+        self.setup = setup
+
+    def __repr__(self):
+        return "{} (by {})".format(self.name, self.parameter)
+
+
+AGENT_TYPES = {
+    "constant": random_piecewise_constant_agents,
+    "uniform": random_piecewise_uniform_agents,
+    "exact": random_exact_piecewise_constant_agents,
+    "linear": random_piecewise_linear_agents,
+    "population": random_agent_population,
+}
+
+
+def cut_and_choose_case(protocol_name:str, agent_type:str)->Case:
+    def setup(num_of_segments, rng):
+        from fairpy import cut_and_choose
+        protocol = getattr(cut_and_choose, protocol_name)
+        agents = AGENT_TYPES[agent_type](2, num_of_segments, rng)
+        return lambda: protocol(agents)
+    return Case("cut_and_choose.{}[{}]".format(protocol_name, agent_type), "segments", {
+        "quick": [10, 100, 1000, 10000],
+        "full": [10, 100, 1000, 10000, 100000, 1000000],
+    }, setup)
+
+
+def last_diminisher_case(agent_type:str)->Case:
+    def setup(num_of_agents, rng):
+        from fairpy.last_diminisher import last_diminisher
+        agents = AGENT_TYPES[agent_type](num_of_agents, 10, rng)
+        return lambda: last_diminisher(agents)
+    return Case("last_diminisher[{}]".format(agent_type), "agents", {
+        "quick": [2, 10, 100, 300],
+        "full": [2, 10, 100, 1000, 3000, 10000],
+    }, setup)
+
+
+def divide_case()->Case:
+    def setup(inverse_epsilon, rng):
+        from fairpy.socially_efficient_cake_divisions import divide
+        agents = random_piecewise_constant_agents(2, 10, rng)
+        return lambda: divide(agents, 1 / inverse_epsilon)
+    return Case("socially_efficient_cake_divisions.divide[constant]", "1/epsilon", {
+        "quick": [2, 10, 20, 50],
+        "full": [2, 10, 20, 50, 100, 200, 500, 1000],
+    }, setup)
+
+
+def partition_simplex_case()->Case:
+    def setup(samples_per_side, rng):
+        from fairpy.partition_simplex import colormap_many_agents
+        agents = random_piecewise_constant_agents(3, 10, rng)
+        return lambda: colormap_many_agents(agents, samples_per_side, raster=True)
+    return Case("partition_simplex.colormap_many_agents[constant]", "samples_per_side", {
+        "quick": [10, 30, 100, 300],
+        "full": [10, 30, 100, 300, 1000, 3000],
+    }, setup)
+
+
+def eval_many_case(agent_type:str, backend:str=None)->Case:
+    def setup(num_of_segments, rng):
+        agent = AGENT_TYPES[agent_type](1, num_of_segments, rng)[0]
+        agent.backend = backend
+        points = np.sort(rng.random((2, 10000)) * agent.cake_length(), axis=0)
+        agent.eval_many(points[0][:1], points[1][:1])   # compile the numba kernels before timing
+        return lambda: agent.eval_many(points[0], points[1])
+    return Case("agents.eval_many[{}]".format(agent_type if backend is None else agent_type + "," + backend), "segments", {
+        "quick": [10, 100, 1000, 10000],
+        "full": [10, 100, 1000, 10000, 100000, 1000000],
+    }, setup)
+
+
+def scalar_queries_case(agent_type:str)->Case:
+    def setup(num_of_segments, rng):
+        agent = AGENT_TYPES[agent_type](1, num_of_segments, rng)[0]
+        (starts, ends) = np.sort(rng.random((2, 1000)) * agent.cake_length(), axis=0).tolist()
+        targets = (rng.random(1000) * float(agent.cake_value()) / 2).tolist()
+        def queries():
+            for (start, end, target) in zip(starts, ends, targets):
+                agent.eval(start, end)
+                agent.mark(start, target)
+        return queries
+    return Case("agents.eval_and_mark[{}]".format(agent_type), "segments", {
+        "quick": [10, 100, 1000, 10000],
+        "full": [10, 100, 1000, 10000, 100000, 1000000],
+    }, setup)
+
+
+CASES = [
+    cut_and_choose_case("asymmetric_protocol", "constant"),
+    cut_and_choose_case("symmetric_protocol", "constant"),
+    cut_and_choose_case("asymmetric_protocol", "uniform"),
+    last_diminisher_case("constant"),
+    last_diminisher_case("uniform"),
+    last_diminisher_case("exact"),
+    divide_case(),
+    partition_simplex_case(),
+    eval_many_case("constant"),
+    eval_many_case("uniform"),
+] + [
+    eval_many_case(agent_type, backend) for backend in available_backends() if backend != "numpy" for agent_type in ["constant", "uniform"]
+] + [
+    scalar_queries_case("constant"),
+    scalar_queries_case("exact"),
+    scalar_queries_case("linear"),
+    eval_many_case("linear"),
+    last_diminisher_case("population"),
+]
@@ -0,0 +1,83 @@
+"""
+Measure the import time of modules with "python -X importtime", each in a fresh interpreter.
+
+The core modules must not import the optional dependencies (matplotlib, cvxpy, networkx, numba);
+this is checked by the doctests. Running this module also checks that they are imported within
+IMPORT_TIME_BUDGET seconds (a wall-clock check, so it is not part of the doctests):
+
+    python -m benchmarks.import_time
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from typing import *
+import os, subprocess, sys
+
+# Maximum import time, in seconds, of each core module (including numpy).
+IMPORT_TIME_BUDGET = {
+    "fairpy": 0.5,
+    "fairpy.agents": 0.5,
+    "fairpy.allocations": 0.5,
+    "fairpy.last_diminisher": 0.5,
+    "fairpy.cut_and_choose": 0.5,
+    "fairpy.partition_simplex": 0.5,
+}
+
+OPTIONAL_DEPENDENCIES = ["matplotlib", "cvxpy", "networkx", "numba"]
+
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module:str)->Tuple[float, Dict[str, float]]:
+    """
+    Import the given module in a fresh interpreter.
+
+    :return: a tuple (seconds, imports): seconds is the cumulative import time of the module,
+             and imports maps each module imported on the way to its cumulative import time in seconds.
+
+    >>> (seconds, imports) = import_time("fairpy.agents")
+    >>> "numpy" in imports
+    True
+    >>> [dependency for dependency in OPTIONAL_DEPENDENCIES if dependency in imports]
+    []
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=ROOT_FOLDER, capture_output=True, text=True, check=True)
+    imports = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        (self_time, cumulative_time, name) = line[len("import time:"):].split("|")
+        imports[name.strip()] = int(cumulative_time) / 1e6
+    return (imports[module], imports)
+
+
+def check_import_times(budget:Dict[str, float]=IMPORT_TIME_BUDGET, check_times:bool=False)->List[str]:
+    """
+    :param check_times: whether to check the import time of each module against its budget.
+                        The import time depends on the load of the machine, so it is checked only on request.
+    :return: a list of problems: modules that import an optional dependency, or (if check_times) exceed their import-time budget.
+
+    >>> check_import_times()
+    []
+    """
+    problems = []
+    for (module, max_seconds) in budget.items():
+        (seconds, imports) = import_time(module)
+        for dependency in OPTIONAL_DEPENDENCIES:
+            if dependency in imports:
+                problems.append("{} imports {}".format(module, dependency))
+        if check_times and seconds > max_seconds:
+            problems.append("{} takes {:.3f} seconds to import (budget: {} seconds)".format(module, seconds, max_seconds))
+    return problems
+
+
+if __name__ == "__main__":
+    for module in IMPORT_TIME_BUDGET:
+        (seconds, imports) = import_time(module)
+        print("{:30} {:8.3f} seconds".format(module, seconds))
+    problems = check_import_times(check_times=True)
+    for problem in problems:
+        print(problem)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,88 @@
+"""
+Random populations of agents for benchmarks.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from fairpy.population import AgentPopulation
+import numpy as np
+
+
+def random_piecewise_constant_agents(num_of_agents:int, num_of_segments:int, rng=None, normalized:bool=True)->List[PiecewiseConstantAgent]:
+    """
+    :param num_of_agents: number of agents to generate.
+    :param num_of_segments: number of unit-length segments of the cake.
+    :param rng: a numpy random Generator, or a seed.
+    :param normalized: if True, the value of the entire cake is 1 for all agents.
+
+    >>> agents = random_piecewise_constant_agents(3, 10, rng=1)
+    >>> len(agents), agents[0].cake_length(), round(agents[0].cake_value(), 6)
+    (3, 10, 1.0)
+    """
+    rng = np.random.default_rng(rng)
+    values = rng.random((num_of_agents, num_of_segments))
+    if normalized:
+        values /= values.sum(axis=1, keepdims=True)
+    return [PiecewiseConstantAgent(row, "Agent {}".format(i)) for (i, row) in enumerate(values)]
+
+
+def random_piecewise_uniform_agents(num_of_agents:int, num_of_segments:int, rng=None)->List[PiecewiseUniformAgent]:
+    """
+    :param num_of_agents: number of agents to generate.
+    :param num_of_segments: number of desired regions of each agent, inside a cake of length 2*num_of_segments.
+    :param rng: a numpy random Generator, or a seed.
+
+    >>> agents = random_piecewise_uniform_agents(3, 10, rng=1)
+    >>> len(agents), agents[0].cake_length() <= 20, len(agents[0].desired_regions)
+    (3, True, 10)
+    """
+    rng = np.random.default_rng(rng)
+    agents = []
+    for i in range(num_of_agents):
+        # Each region is inside its own slot [2k, 2k+2), so the regions never overlap.
+        starts = 2 * np.arange(num_of_segments) + rng.random(num_of_segments)
+        ends = starts + rng.random(num_of_segments) * (2 * np.arange(1, num_of_segments + 1) - starts)
+        ends = np.maximum(ends, starts + 1e-3)
+        agents.append(PiecewiseUniformAgent(list(zip(starts.tolist(), ends.tolist())), "Agent {}".format(i)))
+    return agents
+
+
+def random_exact_piecewise_constant_agents(num_of_agents:int, num_of_segments:int, rng=None, max_value:int=100)->List[ExactPiecewiseConstantAgent]:
+    """
+    :return: exact agents with random integer values between 1 and max_value.
+
+    >>> agents = random_exact_piecewise_constant_agents(2, 10, rng=1)
+    >>> len(agents), agents[0].cake_length(), type(agents[0].cake_value())
+    (2, 10, <class 'int'>)
+    """
+    rng = np.random.default_rng(rng)
+    values = rng.integers(1, max_value + 1, size=(num_of_agents, num_of_segments))
+    return [ExactPiecewiseConstantAgent(row.tolist(), "Agent {}".format(i)) for (i, row) in enumerate(values)]
+
+
+def random_piecewise_linear_agents(num_of_agents:int, num_of_segments:int, rng=None)->List[PiecewiseLinearAgent]:
+    """
+    :return: piecewise-linear agents with random values, and random slopes that keep the density non-negative.
+
+    >>> agents = random_piecewise_linear_agents(2, 10, rng=1)
+    >>> len(agents), agents[0].cake_length(), bool(min(agents[0].left_densities) >= 0)
+    (2, 10, True)
+    """
+    rng = np.random.default_rng(rng)
+    values = rng.random((num_of_agents, num_of_segments))
+    slopes = (2 * rng.random((num_of_agents, num_of_segments)) - 1) * 2 * values
+    return [PiecewiseLinearAgent(values[i], slopes[i], "Agent {}".format(i)) for i in range(num_of_agents)]
+
+
+def random_agent_population(num_of_agents:int, num_of_segments:int, rng=None)->AgentPopulation:
+    """
+    :return: a population with the same values as random_piecewise_constant_agents with the same rng.
+
+    >>> population = random_agent_population(3, 10, rng=1)
+    >>> population[0].values.tolist() == random_piecewise_constant_agents(3, 10, rng=1)[0].values.tolist()
+    True
+    """
+    agents = random_piecewise_constant_agents(num_of_agents, num_of_segments, rng)
+    return AgentPopulation([agent.values for agent in agents], [agent.name() for agent in agents])
@@ -0,0 +1,150 @@
+"""
+Run the benchmark cases, compute scaling exponents, save the results and compare result files.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from benchmarks.cases import Case
+from typing import *
+import numpy as np
+import csv, json, platform, sys, time
+
+import logging
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = ["case", "parameter", "size", "seconds"]
+
+
+def time_function(function, repeat:int=3)->float:
+    """
+    :return: the minimum wall-time (in seconds) of the given function over several runs.
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return min(durations)
+
+
+def run_case(case:Case, sizes:List[float], repeat:int=3, seed:int=0, max_seconds:float=None)->List[dict]:
+    """
+    Time the given case at each of the given sizes.
+    If max_seconds is given, the larger sizes are skipped once a single run takes longer than that.
+    """
+    results = []
+    for size in sizes:
+        function = case.setup(size, np.random.default_rng(seed))
+        seconds = time_function(function, repeat)
+        logger.info("%s: %s=%s: %f seconds", case.name, case.parameter, size, seconds)
+        results.append({"case": case.name, "parameter": case.parameter, "size": size, "seconds": seconds})
+        if max_seconds is not None and seconds > max_seconds:
+            logger.info("%s: skipping sizes larger than %s", case.name, size)
+            break
+    return results
+
+
+def scaling_exponent(sizes:List[float], seconds:List[float])->float:
+    """
+    :return: the exponent k of the best fit seconds ~ size^k in log-log scale (None if there are fewer than two sizes).
+
+    >>> scaling_exponent([10, 100, 1000], [0.001, 0.1, 10])
+    2.0
+    >>> scaling_exponent([10], [0.001]) is None
+    True
+    """
+    if len(sizes) < 2:
+        return None
+    (slope, intercept) = np.polyfit(np.log(sizes), np.log(seconds), 1)
+    return round(float(slope), 3)
+
+
+def scaling_exponents(results:List[dict])->dict:
+    """
+    :return: a dict that maps each case name to its scaling exponent.
+    """
+    exponents = {}
+    for case_name in dict.fromkeys(result["case"] for result in results):
+        case_results = [result for result in results if result["case"] == case_name]
+        exponents[case_name] = scaling_exponent(
+            [result["size"] for result in case_results], [result["seconds"] for result in case_results])
+    return exponents
+
+
+def run(cases:List[Case], profile:str="quick", repeat:int=3, seed:int=0, max_seconds:float=None)->dict:
+    """
+    Run all the given cases with the sizes of the given profile.
+    :return: a dict with the metadata of the run, the results and the scaling exponents.
+    """
+    results = []
+    for case in cases:
+        results += run_case(case, case.sizes[profile], repeat, seed, max_seconds)
+    return {
+        "metadata": {
+            "profile": profile,
+            "repeat": repeat,
+            "seed": seed,
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+        "exponents": scaling_exponents(results),
+    }
+
+
+def write_json(report:dict, filename:str):
+    with open(filename, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+def write_csv(report:dict, filename:str):
+    with open(filename, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(report["results"])
+
+
+def load(filename:str)->dict:
+    """
+    Load a result file written by write_json or write_csv.
+    """
+    if filename.endswith(".csv"):
+        with open(filename, newline="") as file:
+            results = [{"case": row["case"], "parameter": row["parameter"],
+                        "size": float(row["size"]), "seconds": float(row["seconds"])}
+                       for row in csv.DictReader(file)]
+        return {"metadata": {}, "results": results, "exponents": scaling_exponents(results)}
+    with open(filename) as file:
+        return json.load(file)
+
+
+def compare(old:dict, new:dict, threshold:float=1.25, min_seconds:float=1e-3)->List[dict]:
+    """
+    Compare the results of two runs.
+
+    :param threshold: a result is a regression if it is slower than the old result by more than this factor.
+    :param min_seconds: results that are faster than this in both runs are never regressions (they are mostly noise).
+    :return: a list with one dict per (case, size) that appears in both runs, with the ratio new/old.
+
+    >>> old = {"results": [{"case": "a", "size": 10, "seconds": 1.0}, {"case": "a", "size": 100, "seconds": 2.0}]}
+    >>> new = {"results": [{"case": "a", "size": 10, "seconds": 1.1}, {"case": "a", "size": 100, "seconds": 3.0}]}
+    >>> [(row["size"], row["ratio"], row["regression"]) for row in compare(old, new)]
+    [(10, 1.1, False), (100, 1.5, True)]
+    """
+    old_seconds = {(result["case"], float(result["size"])): result["seconds"] for result in old["results"]}
+    comparison = []
+    for result in new["results"]:
+        key = (result["case"], float(result["size"]))
+        if key not in old_seconds:
+            continue
+        (before, after) = (old_seconds[key], result["seconds"])
+        ratio = round(after / before, 3) if before > 0 else float("inf")
+        comparison.append({
+            "case": result["case"], "size": result["size"],
+            "old_seconds": before, "new_seconds": after, "ratio": ratio,
+            "regression": ratio > threshold and max(before, after) >= min_seconds,
+        })
+    return comparison
@@ -7,9 +7,10 @@ Programmer: Erel Segal-Halevi
 Since: 2019-11
 """
 
-from agents import *
+from fairpy.agents import *
 
-import cut_and_choose, logging, sys
+from fairpy import cut_and_choose
+import logging, sys
 
 cut_and_choose.logger.addHandler(logging.StreamHandler(sys.stdout))
 cut_and_choose.logger.setLevel(logging.INFO)
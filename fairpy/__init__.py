@@ -0,0 +1,11 @@
+"""
+fairpy: fair division algorithms in Python.
+
+The agents and allocations are imported here; each algorithm is in its own module, e.g.:
+
+    from fairpy.agents import *
+    from fairpy.last_diminisher import last_diminisher
+"""
+
+from fairpy.agents import *
+from fairpy.allocations import *
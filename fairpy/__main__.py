@@ -0,0 +1,8 @@
+"""
+Run the fairpy command-line interface: python -m fairpy --help
+"""
+
+from fairpy.cli import main
+import sys
+
+sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+A binary on-disk format for populations of piecewise-constant agents, loaded by memory-mapping.
+
+Layout of a file (all numbers are little-endian):
+
+* a 64-byte header: magic (8 bytes), version (uint32), reserved (uint32),
+  number of agents n (uint64), total number of segments S (uint64), length of the names block (uint64), zero padding;
+* offsets: n+1 int64 - the values of agent i are values[offsets[i]:offsets[i+1]];
+* values: S float64;
+* cumulative values: S+n float64 - the prefix sums of each agent, starting with 0, at [offsets[i]+i : offsets[i+1]+i+1];
+* names: a UTF-8 JSON list with the name of each agent (or null).
+
+Loading does not read the values: the agents are created as views into the memory-mapped file,
+so the operating system loads only the pages that are actually used, and shares them among processes.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+import json, os
+
+import logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FAIRPYAG"
+VERSION = 1
+HEADER_SIZE = 64
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("reserved", "<u4"),
+    ("num_of_agents", "<u8"), ("num_of_segments", "<u8"), ("names_length", "<u8")])
+
+
+def save_agents(filename:str, agents:List[PiecewiseConstantAgent]):
+    """
+    Save piecewise-constant agents to a binary file that can be loaded by AgentStore.
+
+    :param agents: a list of PiecewiseConstantAgent (or of arrays of values, for anonymous agents).
+    """
+    names = [agent.name() if isinstance(agent, Agent) and hasattr(agent, "my_name") else None for agent in agents]
+    values = [agent.values if isinstance(agent, Agent) else agent for agent in agents]
+    lengths = np.array([len(agent_values) for agent_values in values], dtype="<i8")
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype("<i8")
+    names_block = json.dumps(names).encode("utf-8")
+    header = np.zeros(1, dtype=HEADER)
+    header[0] = (MAGIC, VERSION, 0, len(values), offsets[-1], len(names_block))
+    with open(filename, "wb") as file:
+        file.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+        offsets.tofile(file)
+        for agent_values in values:
+            np.asarray(agent_values, dtype="<f8").tofile(file)
+        for agent_values in values:
+            np.concatenate(([0], np.cumsum(agent_values, dtype=float))).astype("<f8").tofile(file)
+        file.write(names_block)
+
+
+def _map_array(filename:str, dtype:str, position:int, size:int)->Tuple[np.ndarray, int]:
+    """
+    :return: a read-only memory-mapped array of the given size at the given position, and the position after it.
+    """
+    array = np.memmap(filename, dtype=dtype, mode="r", offset=position, shape=(size,)) if size > 0 else np.zeros(0, dtype=dtype)
+    return (array, position + array.nbytes)
+
+
+class AgentStore:
+    """
+    A read-only population of piecewise-constant agents, memory-mapped from a file written by save_agents.
+
+    >>> import os, tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), "population.agents")
+    >>> save_agents(filename, [PiecewiseConstantAgent([11,22,33,44], "Alice"), PiecewiseConstantAgent([1,2], "George"), [5,5,5]])
+    >>> store = AgentStore(filename)
+    >>> len(store)
+    3
+    >>> store[0]
+    Alice is a piecewise-constant agent with values [11. 22. 33. 44.] and total value=110.0
+    >>> store[1].eval(0.5, 2), store[1].mark(0, 2)
+    (2.5, 1.5)
+    >>> store[2].name(), store[2].cake_length(), store[2].cake_value()
+    ('Anonymous', 3, 15.0)
+    >>> [agent.name() for agent in store.agents()]
+    ['Alice', 'George', 'Anonymous']
+    >>> import pickle
+    >>> len(pickle.loads(pickle.dumps(store)))
+    3
+
+    An empty or truncated file is rejected:
+
+    >>> open(filename + ".empty", "wb").close()
+    >>> AgentStore(filename + ".empty")   # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: ....empty is not an agent-store file
+    >>> with open(filename, "rb") as file, open(filename + ".truncated", "wb") as truncated:
+    ...     _ = truncated.write(file.read()[:-10])
+    >>> AgentStore(filename + ".truncated")   # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: ....truncated has 279 bytes, but its header requires 289 bytes
+    """
+
+    def __init__(self, filename:str):
+        self.filename = filename
+        headers = np.fromfile(filename, dtype=HEADER, count=1)
+        if len(headers) < 1 or headers[0]["magic"] != MAGIC:
+            raise ValueError("{} is not an agent-store file".format(filename))
+        header = headers[0]
+        if header["version"] != VERSION:
+            raise ValueError("{} has an unsupported version {}".format(filename, header["version"]))
+        (num_of_agents, num_of_segments) = (int(header["num_of_agents"]), int(header["num_of_segments"]))
+        expected_size = HEADER_SIZE + 8 * ((num_of_agents+1) + num_of_segments + (num_of_segments+num_of_agents)) + int(header["names_length"])
+        actual_size = os.path.getsize(filename)
+        if actual_size != expected_size:
+            raise ValueError("{} has {} bytes, but its header requires {} bytes".format(filename, actual_size, expected_size))
+        position = HEADER_SIZE
+        (self.offsets, position) = _map_array(filename, "<i8", position, num_of_agents+1)
+        (self.values, position) = _map_array(filename, "<f8", position, num_of_segments)
+        (self.cumulative_values, position) = _map_array(filename, "<f8", position, num_of_segments+num_of_agents)
+        with open(filename, "rb") as file:
+            file.seek(position)
+            self.names = json.loads(file.read(int(header["names_length"])).decode("utf-8"))
+        logger.info("Loaded %d agents with %d segments from %s", num_of_agents, num_of_segments, filename)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index:int)->PiecewiseConstantAgent:
+        """
+        :return: the agent with the given index, whose arrays are views into the memory-mapped file.
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError("agent index {} out of range".format(index))
+        index %= len(self)
+        (begin, end) = (int(self.offsets[index]), int(self.offsets[index+1]))
+        return PiecewiseConstantAgent.from_arrays(
+            self.values[begin:end], self.cumulative_values[begin+index:end+index+1], self.names[index])
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def agents(self)->List[PiecewiseConstantAgent]:
+        return list(self)
+
+    def __reduce__(self):
+        # Pickle only the file name, so that sending a store to another process does not copy the values.
+        return (AgentStore, (self.filename,))
+
+
+def load_agents(filename:str)->List[PiecewiseConstantAgent]:
+    """
+    :return: a list of the agents in the given agent-store file.
+    """
+    return AgentStore(filename).agents()
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
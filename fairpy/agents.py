@@ -0,0 +1,856 @@
+"""
+Defines agents with various kinds of valuation functions.
+
+Programmer: Erel Segal-Halevi
+Since: 2019-11
+"""
+
+from abc import ABC, abstractmethod
+import numpy as np
+import math, bisect, itertools
+from fractions import Fraction
+from fairpy import kernels
+from typing import *
+
+
+class Agent(ABC):
+    """
+    An abstract class that describes a participant in a cake-cutting algorithm.
+    It can answer the standard "mark" and "eval" queries.
+
+    It may also have a name, which is used only in demonstrations and for tracing. The name may be left blank (None).
+    """
+
+    def __init__(self, name:str=None):
+        if name is not None:
+            self.my_name = name
+
+    def name(self):
+        if hasattr(self, 'my_name') and self.my_name is not None:
+            return self.my_name
+        else:
+            return "Anonymous"
+
+    @abstractmethod
+    def cake_value(self):
+        """
+        :return: the value of the entire cake for the agent.
+        """
+        pass
+
+
+    @abstractmethod
+    def cake_length(self):
+        """
+        :return: the total length of the cake that the agent cares about.
+        """
+        pass
+
+
+    @abstractmethod
+    def eval(self, start:float, end:float):
+        """
+        Answer an Eval query: return the value of the interval [start,end].
+
+        :param start: Location on cake where the calculation starts.
+        :param end:   Location on cake where the calculation ends.
+        :return: Value of [start,end]
+        """
+        pass
+
+    @abstractmethod
+    def mark(self, start:float, targetValue:float):
+        """
+        Answer a Mark query: return "end" such that the value of the interval [start,end] is targetValue.
+
+        :param start: Location on cake where the calculation starts.
+        :param targetValue: required value for the piece [start,end]
+        :return: the end of an interval with a value of targetValue.
+        """
+        pass
+
+    def eval_many(self, starts:np.ndarray, ends:np.ndarray)->np.ndarray:
+        """
+        Answer many Eval queries at once.
+        The default implementation calls eval in a loop; subclasses override it with a vectorized calculation.
+
+        :param starts: an array of locations on cake where the calculations start.
+        :param ends:   an array of locations on cake where the calculations end (broadcastable with starts).
+        :return: an array with the value of each interval [starts[i],ends[i]].
+        """
+        (starts, ends) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+        values = [self.eval(start, end) for (start, end) in zip(starts.flat, ends.flat)]
+        return np.array(values, dtype=float).reshape(starts.shape)
+
+    def mark_many(self, starts:np.ndarray, target_values:np.ndarray)->np.ndarray:
+        """
+        Answer many Mark queries at once.
+        The default implementation calls mark in a loop; subclasses override it with a vectorized calculation.
+
+        :param starts: an array of locations on cake where the calculations start.
+        :param target_values: an array of required values (broadcastable with starts).
+        :return: an array with the end of each interval; NaN where mark would return None.
+        """
+        (starts, target_values) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(target_values, dtype=float))
+        ends = [self.mark(start, target_value) for (start, target_value) in zip(starts.flat, target_values.flat)]
+        return np.array([np.nan if end is None else end for end in ends], dtype=float).reshape(starts.shape)
+
+    def piece_value(self, piece:List[tuple]):
+        """
+        Evaluate a piece made of several intervals.
+        :param piece: a list of tuples [(start1,end1), (start2,end2),...]
+        :return:
+        """
+        if len(piece) == 0:
+            return 0
+        (starts, ends) = zip(*piece)
+        return float(self.eval_many(starts, ends).sum())
+
+    def partition_values(self, partition:List[float]):
+        """
+        Evaluate all the pieces in the given partition.
+        :param partition: a list of k cut-points [cut1,cut2,...]
+        :return: a list of k+1 values: eval(0,cut1), eval(cut1,cut2), ...
+
+        >>> a = PiecewiseConstantAgent([1,2,3,4])
+        >>> a.partition_values([1,2])
+        [1.0, 2.0, 7.0]
+        >>> a.partition_values([3,3])
+        [6.0, 0.0, 4.0]
+        """
+        cuts = [0] + list(partition) + [self.cake_length()]
+        return self.eval_many(cuts[:-1], cuts[1:]).tolist()
+
+
+class PiecewiseConstantAgent(Agent):
+    """
+    A PiecewiseConstantAgent is an Agent whose value function has a constant density on a finite number of intervals.
+
+    >>> a = PiecewiseConstantAgent([11,22,33,44]) # Four desired intervals: the leftmost has value 11, the second one 22, etc.
+    >>> a.cake_value()
+    110
+    >>> a.cake_length()
+    4
+    >>> a.eval(1,3)
+    55.0
+    >>> a.mark(1, 77)
+    3.5
+    >>> a.name()
+    'Anonymous'
+    >>> a.piece_value([(0,1),(2,3)])
+    44.0
+
+
+    >>> Alice = PiecewiseConstantAgent([11,22,33,44], "Alice")
+    >>> Alice.name()
+    'Alice'
+    """
+
+    # The backend of the batch queries ("numpy", "python" or "numba"; see kernels.py). None means the global backend.
+    backend = None
+
+    def __init__(self, values:list, name:str=None):
+        super().__init__(name)
+        self.values = np.array(values)
+        self.length = len(values)
+        self.total_value_cache = sum(values)
+        # cumulative_values[i] is the value of the interval [0,i]; used for O(1) eval and O(log n) mark.
+        self.cumulative_values = np.concatenate(([0], np.cumsum(self.values)))
+
+    @classmethod
+    def from_arrays(cls, values:np.ndarray, cumulative_values:np.ndarray=None, name:str=None):
+        """
+        Create an agent that uses the given arrays without copying them, e.g., views into a memory-mapped file.
+
+        :param values: the value of each unit interval.
+        :param cumulative_values: the prefix sums of values, starting with 0 (calculated if not given).
+
+        >>> values = np.array([11., 22., 33., 44.])
+        >>> a = PiecewiseConstantAgent.from_arrays(values, name="Alice")
+        >>> a.values is values
+        True
+        >>> a.cake_value(), a.eval(1,3), a.mark(1, 77)
+        (110.0, 55.0, 3.5)
+        """
+        agent = cls.__new__(cls)
+        Agent.__init__(agent, name)
+        agent.values = values
+        agent.length = len(values)
+        agent.cumulative_values = np.concatenate(([0], np.cumsum(values))) if cumulative_values is None else cumulative_values
+        agent.total_value_cache = agent.cumulative_values[-1]
+        return agent
+
+    def __repr__(self):
+        return "{} is a piecewise-constant agent with values {} and total value={}".format(self.my_name, self.values, self.total_value_cache)
+
+    def cake_value(self):
+        return self.total_value_cache
+
+    def cake_length(self):
+        return self.length
+
+    def cumulative_value(self, x:float):
+        """
+        :param x: a location on the cake, between 0 and length.
+        :return: the value of the interval [0,x].
+
+        >>> a = PiecewiseConstantAgent([11,22,33,44])
+        >>> a.cumulative_value(1.5)
+        22.0
+        >>> a.cumulative_value(4)
+        110
+        """
+        x_floor = int(x)
+        if x_floor >= self.length:
+            return self.cumulative_values[-1]
+        return self.cumulative_values[x_floor] + self.values[x_floor] * (x - x_floor)
+
+    def eval(self, start:float, end:float):
+        """
+        Answer an Eval query: return the value of the interval [start,end].
+
+        :param start: Location on cake where the calculation starts.
+        :param end:   Location on cake where the calculation ends.
+        :return: Value of [start,end]
+
+        >>> a = PiecewiseConstantAgent([11,22,33,44])
+        >>> a.eval(1,3)
+        55.0
+        >>> a.eval(1.5,3)
+        44.0
+        >>> a.eval(1,3.25)
+        66.0
+        >>> a.eval(1.5,3.25)
+        55.0
+        >>> a.eval(3,3)
+        0.0
+        >>> a.eval(3,7)
+        44.0
+        >>> a.eval(-1,7)
+        110.0
+        """
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        start = max(0, min(start, self.length))
+        end   = max(0, min(end,   self.length))
+        if end <= start:
+            return 0.0  # special case not covered by the calculation below
+
+        fromFloor = math.floor(start)
+        fromFraction = (fromFloor + 1 - start)
+        toCeiling = math.ceil(end)
+        toCeilingRemovedFraction = (toCeiling - end)
+
+        val = 0.0
+        val += (self.values[fromFloor] * fromFraction)
+        if toCeiling > fromFloor + 1:  # the value of the whole segments between fromFloor and toCeiling
+            val += self.cumulative_values[toCeiling] - self.cumulative_values[fromFloor + 1]
+        val -= (self.values[toCeiling - 1] * toCeilingRemovedFraction)
+
+        return val
+
+    def mark(self, start:float, target_value:float):
+        """
+        Answer a Mark query: return "end" such that the value of the interval [start,end] is target_value.
+
+        :param start: Location on cake where the calculation starts.
+        :param targetValue: required value for the piece [start,end]
+        :return: the end of an interval with a value of target_value.
+        If the value is too high - returns None.
+        The search uses binary search on the cumulative values, so it assumes that all values are non-negative.
+
+        >>> a = PiecewiseConstantAgent([11,22,33,44])
+        >>> a.mark(1, 55)
+        3.0
+        >>> a.mark(1.5, 44)
+        3.0
+        >>> a.mark(1, 66)
+        3.25
+        >>> a.mark(1.5, 55)
+        3.25
+        >>> a.mark(1, 99)
+        4.0
+        >>> a.mark(1, 100)
+        >>> a.mark(1, 0)
+        1.0
+        """
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        start = max(0, start)
+        if start >= self.length:
+            return None  # value is too high
+
+        if target_value < 0:
+            raise ValueError("sum out of range (should be positive): {}".format(sum))
+        if target_value == 0:
+            return float(start)
+
+        cumulative_values = self.cumulative_values
+        start_floor = int(start)
+        start_value = self.values[start_floor]
+        goal = (cumulative_values[start_floor] + start_value * (start - start_floor)) + target_value
+        if goal <= cumulative_values[start_floor + 1]:  # the mark is in the first segment
+            return float(start + (target_value / start_value))
+        if goal > cumulative_values[-1]:
+            return None  # Value is too high
+
+        # Find the first segment i whose right end has a cumulative value of at least goal.
+        # bisect is faster than np.searchsorted for a single query.
+        i = bisect.bisect_left(cumulative_values, goal, start_floor + 2) - 1
+        return float(i + (goal - cumulative_values[i]) / self.values[i])
+
+    def eval_many(self, starts:np.ndarray, ends:np.ndarray)->np.ndarray:
+        """
+        Answer many Eval queries at once, using the same calculation as eval.
+
+        >>> a = PiecewiseConstantAgent([11,22,33,44])
+        >>> a.eval_many([1, 1.5, 1, 1.5, 3, 3, -1], [3, 3, 3.25, 3.25, 3, 7, 7])
+        array([ 55.,  44.,  66.,  55.,   0.,  44., 110.])
+        """
+        (starts, ends) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+        kernel = kernels.get_backend(self.backend).constant_eval
+        return kernel(self.values, self.cumulative_values, starts.ravel(), ends.ravel()).reshape(starts.shape)
+
+    def mark_many(self, starts:np.ndarray, target_values:np.ndarray)->np.ndarray:
+        """
+        Answer many Mark queries at once, using the same calculation as mark.
+
+        >>> a = PiecewiseConstantAgent([11,22,33,44])
+        >>> a.mark_many([1, 1.5, 1, 1.5, 1, 1, 1, 4], [55, 44, 66, 55, 99, 100, 0, 1])
+        array([3.  , 3.  , 3.25, 3.25, 4.  ,  nan, 1.  ,  nan])
+        """
+        (starts, target_values) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(target_values, dtype=float))
+        if np.any(target_values < 0):
+            raise ValueError("sum out of range (should be positive): {}".format(target_values.min()))
+        kernel = kernels.get_backend(self.backend).constant_mark
+        return kernel(self.values, self.cumulative_values, starts.ravel(), target_values.ravel()).reshape(starts.shape)
+
+
+class ExactPiecewiseConstantAgent(PiecewiseConstantAgent):
+    """
+    A PiecewiseConstantAgent that answers eval and mark queries exactly, using integer or Fraction arithmetic.
+    Floats are converted to the Fraction with the same (binary) value, so no rounding happens inside the agent.
+    The prefix sums are exact too, so the queries are still O(1) for eval and O(log n) for mark.
+
+    >>> a = ExactPiecewiseConstantAgent([11,22,33,44])
+    >>> a.cake_value()
+    110
+    >>> a.eval(1,3)
+    55
+    >>> a.eval(Fraction(1,3), 2)
+    Fraction(88, 3)
+    >>> a.mark(1, 66)
+    Fraction(13, 4)
+    >>> a.mark(1, 100)
+    >>> a.mark(0, a.eval(0, Fraction(1,3))) == Fraction(1,3)
+    True
+    >>> b = ExactPiecewiseConstantAgent([0.1, 0.2, 0.3])
+    >>> b.eval(0, 2) == b.eval(0, 1) + b.eval(1, 2)
+    True
+    >>> b.eval_many([0, 1], [1, 3])
+    array([0.1, 0.5])
+    >>> a.piece_value([(0, Fraction(1,3)), (2, 3)]), a.partition_values([Fraction(1,2), 2])
+    (Fraction(110, 3), [Fraction(11, 2), Fraction(55, 2), 77])
+    """
+
+    def __init__(self, values:list, name:str=None):
+        Agent.__init__(self, name)
+        self.length = len(values)
+        self.exact_values = [exact(value) for value in values]
+        self.exact_cumulative_values = list(itertools.accumulate(self.exact_values, initial=0))
+        self.total_value_cache = self.exact_cumulative_values[-1]
+
+    @property
+    def values(self)->np.ndarray:
+        """
+        The values rounded to floats, e.g. for saving with save_agents; the queries use exact_values.
+        """
+        return np.array(self.exact_values, dtype=float)
+
+    def __repr__(self):
+        return "{} is an exact piecewise-constant agent with values {} and total value={}".format(
+            self.name(), [str(value) for value in self.exact_values], self.total_value_cache)
+
+    @classmethod
+    def from_arrays(cls, values:np.ndarray, cumulative_values:np.ndarray=None, name:str=None):
+        """
+        Create an exact agent from an array of values.
+        Unlike PiecewiseConstantAgent.from_arrays, the values are copied, since the exact prefix sums
+        must be recomputed from them; the given cumulative_values are not used.
+
+        >>> a = ExactPiecewiseConstantAgent.from_arrays(np.array([11, 22, 33, 44]), name="Alice")
+        >>> a.cake_value(), a.eval(Fraction(1,3), 2), a.mark(1, 66)
+        (110, Fraction(88, 3), Fraction(13, 4))
+        >>> ExactPiecewiseConstantAgent.from_arrays(np.array([0.5, 0.25])).cake_value()
+        Fraction(3, 4)
+        """
+        return cls(np.asarray(values).tolist(), name)
+
+    def cumulative_value(self, x):
+        """
+        :return: the exact value of the interval [0,x].
+
+        >>> ExactPiecewiseConstantAgent([11,22,33,44]).cumulative_value(1.5)
+        Fraction(22, 1)
+        """
+        x = exact(x)
+        if x <= 0:
+            return 0
+        if x >= self.length:
+            return self.exact_cumulative_values[-1]
+        x_floor = math.floor(x)
+        return self.exact_cumulative_values[x_floor] + self.exact_values[x_floor] * (x - x_floor)
+
+    def eval(self, start, end):
+        start = max(0, min(exact(start), self.length))
+        end   = max(0, min(exact(end),   self.length))
+        if end <= start:
+            return 0
+        return self.cumulative_value(end) - self.cumulative_value(start)
+
+    def mark(self, start, target_value):
+        start = max(0, exact(start))
+        if start >= self.length:
+            return None  # value is too high
+        target_value = exact(target_value)
+        if target_value < 0:
+            raise ValueError("sum out of range (should be positive): {}".format(target_value))
+        if target_value == 0:
+            return start
+        goal = self.cumulative_value(start) + target_value
+        if goal > self.exact_cumulative_values[-1]:
+            return None  # value is too high
+        # Find the first segment i whose right end has a cumulative value of at least goal.
+        i = max(bisect.bisect_left(self.exact_cumulative_values, goal) - 1, math.floor(start))
+        return i + Fraction(goal - self.exact_cumulative_values[i]) / self.exact_values[i]
+
+    # The batch queries answer each query exactly, and round only the final results to float.
+    eval_many = Agent.eval_many
+    mark_many = Agent.mark_many
+
+    def piece_value(self, piece:List[tuple]):
+        """
+        :return: the exact value of a piece made of several intervals.
+        """
+        return sum(self.eval(start, end) for (start, end) in piece)
+
+    def partition_values(self, partition:List[float]):
+        """
+        :return: a list with the exact values of the pieces in the given partition.
+        """
+        cuts = [0] + list(partition) + [self.cake_length()]
+        return [self.eval(start, end) for (start, end) in zip(cuts[:-1], cuts[1:])]
+
+
+def exact(x):
+    """
+    Convert a number to an exact number: ints and Fractions are kept, other numbers are converted to Fraction.
+
+    >>> exact(3), exact(0.5), exact(np.int64(2))
+    (3, Fraction(1, 2), 2)
+    """
+    if isinstance(x, (int, Fraction)):
+        return x
+    if isinstance(x, np.integer):
+        return int(x)
+    return Fraction(x)
+
+
+class PiecewiseLinearAgent(Agent):
+    """
+    A PiecewiseLinearAgent is an Agent whose value function has a linear density on each unit interval.
+    On the interval [i,i+1], the density at i+t (for t in [0,1]) is values[i] - slopes[i]/2 + slopes[i]*t,
+    so values[i] is the value of the entire interval, and slopes[i] is the slope of the density in it.
+    The density must be non-negative at both ends of each interval, i.e., |slopes[i]| <= 2*values[i].
+
+    >>> a = PiecewiseLinearAgent([1, 2], [0, 2])  # The density is 1 on [0,1] and 1+2t on [1,2]
+    >>> a.cake_value()
+    3
+    >>> a.cake_length()
+    2
+    >>> a.eval(1, 1.5)
+    0.75
+    >>> a.mark(1, 0.75)
+    1.5
+    >>> a.eval_many([0, 1, 0.5], [2, 1.5, 1.5])
+    array([3.  , 0.75, 1.25])
+    >>> a.mark_many([0, 1, 0.5], [3, 0.75, 1.25])
+    array([2. , 1.5, 1.5])
+    >>> PiecewiseLinearAgent([1, 2], [0, 5])
+    Traceback (most recent call last):
+    ...
+    ValueError: The density of interval 1 is negative: slope 5.0 is larger in absolute value than twice its value 2.0
+    """
+
+    def __init__(self, values:list, slopes:list, name:str=None):
+        super().__init__(name)
+        if len(values) != len(slopes):
+            raise ValueError("There are {} values but {} slopes".format(len(values), len(slopes)))
+        self.values = np.array(values, dtype=float)
+        self.slopes = np.array(slopes, dtype=float)
+        # mark assumes that the density is non-negative, so that the cumulative value is monotone.
+        invalid = np.flatnonzero(np.abs(self.slopes) > 2 * self.values)
+        if len(invalid) > 0:
+            i = invalid[0]
+            raise ValueError("The density of interval {} is negative: slope {} is larger in absolute value than twice its value {}".format(
+                i, self.slopes[i], self.values[i]))
+        self.length = len(values)
+        self.total_value_cache = sum(values)
+        # The density at the left end of each interval, and the value of [0,i] for each i.
+        self.left_densities = self.values - self.slopes / 2
+        self.cumulative_values = np.concatenate(([0], np.cumsum(self.values)))
+
+    def __repr__(self):
+        return "{} is a piecewise-linear agent with values {}, slopes {} and total value={}".format(self.name(), self.values, self.slopes, self.total_value_cache)
+
+    def cake_value(self):
+        return self.total_value_cache
+
+    def cake_length(self):
+        return self.length
+
+    def cumulative_value(self, x:float):
+        """
+        :return: the value of the interval [0,x].
+
+        >>> PiecewiseLinearAgent([1, 2], [0, 2]).cumulative_value(1.5)
+        1.75
+        """
+        if x <= 0:
+            return 0.0
+        if x >= self.length:
+            return float(self.cumulative_values[-1])
+        i = int(x)
+        t = x - i
+        return float(self.cumulative_values[i] + (self.left_densities[i] + self.slopes[i] * t / 2) * t)
+
+    def eval(self, start:float, end:float):
+        """
+        Answer an Eval query: return the value of the interval [start,end].
+
+        >>> a = PiecewiseLinearAgent([1, 2, 3], [0, 2, -2])
+        >>> a.eval(0, 3), a.eval(1, 2), a.eval(2, 2.5), a.eval(-1, 0.5), a.eval(2, 1)
+        (6.0, 2.0, 1.75, 0.5, 0.0)
+        """
+        if end <= start:
+            return 0.0
+        return self.cumulative_value(end) - self.cumulative_value(start)
+
+    def mark(self, start:float, target_value:float):
+        """
+        Answer a Mark query: return "end" such that the value of the interval [start,end] is target_value.
+        If the value is too high - returns None.
+
+        >>> a = PiecewiseLinearAgent([1, 2, 3], [0, 2, -2])
+        >>> a.mark(0, 6), a.mark(1, 2), a.mark(2, 1.75), a.mark(0, 0.5), a.mark(1, 0), a.mark(1, 5.5)
+        (3.0, 2.0, 2.5, 0.5, 1.0, None)
+        """
+        if target_value < 0:
+            raise ValueError("sum out of range (should be positive): {}".format(target_value))
+        start = max(0, start)
+        if start >= self.length:
+            return None  # value is too high
+        if target_value == 0:
+            return float(start)
+        goal = self.cumulative_value(start) + target_value
+        if goal > self.cumulative_values[-1]:
+            return None  # value is too high
+        # Find the first interval i whose right end has a cumulative value of at least goal.
+        i = max(int(np.searchsorted(self.cumulative_values, goal, side='left')) - 1, int(start))
+        return float(i + _solve_quadratic(self.slopes[i], self.left_densities[i], goal - self.cumulative_values[i]))
+
+    def eval_many(self, starts:np.ndarray, ends:np.ndarray)->np.ndarray:
+        (starts, ends) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+        return np.where(ends > starts, self.cumulative_values_many(ends) - self.cumulative_values_many(starts), 0.0)
+
+    def cumulative_values_many(self, xs:np.ndarray)->np.ndarray:
+        xs = np.clip(np.asarray(xs, dtype=float), 0, self.length)
+        i = np.minimum(np.floor(xs).astype(int), self.length - 1)
+        t = xs - i
+        return self.cumulative_values[i] + (self.left_densities[i] + self.slopes[i] * t / 2) * t
+
+    def mark_many(self, starts:np.ndarray, target_values:np.ndarray)->np.ndarray:
+        (starts, target_values) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(target_values, dtype=float))
+        if np.any(target_values < 0):
+            raise ValueError("sum out of range (should be positive): {}".format(target_values.min()))
+        starts = np.maximum(starts, 0)
+        goals = self.cumulative_values_many(starts) + target_values
+        i = np.searchsorted(self.cumulative_values, goals, side='left') - 1
+        i = np.clip(i, np.minimum(np.floor(starts).astype(int), self.length - 1), self.length - 1)
+        ends = i + _solve_quadratic(self.slopes[i], self.left_densities[i], goals - self.cumulative_values[i])
+        ends = np.where(target_values == 0, starts, ends)
+        too_high = (starts >= self.length) | (goals > self.cumulative_values[-1])
+        return np.where(too_high, np.nan, ends)
+
+
+def _solve_quadratic(slope, left_density, value):
+    """
+    :return: the length u such that the integral of the density left_density + slope*t over [0,u] equals value,
+             i.e., the non-negative root of slope*u^2/2 + left_density*u - value = 0.
+    The form 2*value/(b+sqrt(b^2+2*slope*value)) avoids cancellation when slope is near 0.
+
+    >>> _solve_quadratic(2, 1, 0.75), _solve_quadratic(0, 2, 1), _solve_quadratic(-2, 3, 1.25)
+    (0.5, 0.5, 0.5)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant = np.sqrt(np.maximum(left_density * left_density + 2 * slope * value, 0))
+        return np.where(value > 0, 2 * value / (left_density + discriminant), 0.0) + 0.0
+
+
+class PiecewiseUniformAgent(Agent):
+    """
+    A PiecewiseUniformAgent is an Agent with a finite number of desired intervals, all of which have the same value-density (1).
+
+    >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])   # Three desired intervals: (0..1) and (2..4) and (6..9).
+    >>> a.cake_value()
+    6
+    >>> a.cake_length()
+    9
+    >>> a.eval(0,1.5)
+    1.0
+    >>> a.mark(0, 2)
+    3
+    >>> a.name()
+    'Anonymous'
+
+
+    >>> George = PiecewiseUniformAgent([(0,1),(2,4),(6,9)], "George")
+    >>> George.name()
+    'George'
+
+    >>> b = PiecewiseUniformAgent([(2,4),(0,1),(3,5)])   # Unsorted and overlapping regions are merged once, at construction.
+    >>> b.desired_regions
+    [(0, 1), (2, 5)]
+    >>> b.cake_value()
+    4
+    """
+
+    # The backend of the batch queries ("numpy", "python" or "numba"; see kernels.py). None means the global backend.
+    backend = None
+
+    def __init__(self, desired_regions:List[tuple], name:str=None):
+        super().__init__(name)
+        self.desired_regions = merge_regions(desired_regions)
+        self.length = max([region[1] for region in self.desired_regions])
+        self.total_value_cache = sum([region[1]-region[0] for region in self.desired_regions])
+
+        # An index of the (disjoint, sorted) desired regions, used for O(log n) eval and mark:
+        # cumulative_lengths[i] is the total length of the regions to the left of region i.
+        self.start_list = [region[0] for region in self.desired_regions]
+        self.end_list = [region[1] for region in self.desired_regions]
+        self.cumulative_list = [0]
+        for (region_start, region_end) in self.desired_regions:
+            self.cumulative_list.append(self.cumulative_list[-1] + (region_end - region_start))
+        # The same index as arrays, used by the batch queries.
+        self.region_starts = np.array(self.start_list, dtype=float)
+        self.region_ends = np.array(self.end_list, dtype=float)
+        self.cumulative_lengths = np.array(self.cumulative_list, dtype=float)
+
+    def __repr__(self):
+        return "{} is a piecewise-uniform agent with desired regions {} and total value={}".format(self.my_name, self.desired_regions, self.total_value_cache)
+
+    def cake_value(self):
+        return self.total_value_cache
+
+    def cake_length(self):
+        return self.length
+
+    def cumulative_value(self, x:float):
+        """
+        :param x: a location on the cake.
+        :return: the value of the interval [0,x].
+
+        >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+        >>> a.cumulative_value(3)
+        2
+        >>> a.cumulative_value(5)
+        3
+        >>> a.cumulative_value(-1)
+        0
+        """
+        i = bisect.bisect_right(self.start_list, x) - 1  # the rightmost region that starts at or before x
+        if i < 0:
+            return 0
+        return self.cumulative_list[i] + (min(x, self.end_list[i]) - self.start_list[i])
+
+    def eval(self, start:float, end:float):
+        """
+        Answer an Eval query: return the value of the interval [start,end].
+
+        :param start: Location on cake where the calculation starts.
+        :param end:   Location on cake where the calculation ends.
+        :return: Value of [start,end]
+
+        >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+        >>> a.eval(0,1)
+        1.0
+        >>> a.eval(-1, 1.5)
+        1.0
+        >>> a.eval(0.5, 1.5)
+        0.5
+        >>> a.eval(0.5, 2.5)
+        1.0
+        >>> a.eval(0.5, 4.5)
+        2.5
+        >>> a.eval(1.5, 11)
+        5.0
+        >>> a.eval(3, 11)
+        4.0
+        >>> a.eval(3, 1)
+        0.0
+        """
+        if end <= start:
+            return 0.0  # special case not covered by the calculation below
+
+        # the rightmost regions that start at or before start and end, respectively.
+        first = bisect.bisect_right(self.start_list, start) - 1
+        last = bisect.bisect_right(self.start_list, end) - 1
+        if last < 0:
+            return 0.0  # the entire interval is to the left of all regions.
+
+        val = 0.0
+        if first == last:
+            val += max(0, min(end, self.end_list[last]) - max(start, self.start_list[last]))
+            return val
+        if first >= 0:
+            val += max(0, self.end_list[first] - max(start, self.start_list[first]))
+        val += self.cumulative_list[last] - self.cumulative_list[first + 1]  # the regions strictly between first and last
+        val += min(end, self.end_list[last]) - self.start_list[last]
+        return val
+
+    def mark(self, start:float, target_value:float):
+        """
+        Answer a Mark query: return "end" such that the value of the interval [start,end] is target_value.
+
+        :param start: Location on cake where the calculation starts.
+        :param targetValue: required value for the piece [start,end]
+        :return: the end of an interval with a value of target_value.
+        If the value is too high - returns None.
+
+        >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+        >>> a.mark(0, 1)
+        1
+        >>> a.mark(0, 1.5)
+        2.5
+        >>> a.mark(0.5, 1.5)
+        3.0
+        >>> a.mark(1.5, 0.01)
+        2.01
+        >>> a.mark(1.5, 2)
+        4
+        >>> a.mark(1, 100)
+        >>> a.mark(1, 0)
+        1
+        """
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        if target_value < 0:
+            raise ValueError("sum out of range (should be positive): {}".format(sum))
+
+        start_value = self.cumulative_value(start)
+        # The end is in the first region that ends at or after start, and whose end has a cumulative value of at least start_value+target_value.
+        i = max(bisect.bisect_left(self.end_list, start),
+                bisect.bisect_left(self.cumulative_list, start_value + target_value, 1) - 1)
+        if i >= len(self.desired_regions):
+            return None  # Value is too high
+
+        if start >= self.start_list[i]:
+            return start + target_value
+        target_value -= (self.cumulative_list[i] - start_value)  # the value of the regions between start and region i
+        return self.start_list[i] + target_value
+
+    def eval_many(self, starts:np.ndarray, ends:np.ndarray)->np.ndarray:
+        """
+        Answer many Eval queries at once, using the same calculation as eval.
+
+        >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+        >>> a.eval_many([0, -1, 0.5, 0.5, 0.5, 1.5, 3, 3], [1, 1.5, 1.5, 2.5, 4.5, 11, 11, 1])
+        array([1. , 1. , 0.5, 1. , 2.5, 5. , 4. , 0. ])
+        """
+        (starts, ends) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(ends, dtype=float))
+        kernel = kernels.get_backend(self.backend).uniform_eval
+        return kernel(self.region_starts, self.region_ends, self.cumulative_lengths, starts.ravel(), ends.ravel()).reshape(starts.shape)
+
+    def mark_many(self, starts:np.ndarray, target_values:np.ndarray)->np.ndarray:
+        """
+        Answer many Mark queries at once, using the same calculation as mark.
+
+        >>> a = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+        >>> a.mark_many([0, 0, 0.5, 1.5, 1.5, 1, 1], [1, 1.5, 1.5, 0.01, 2, 100, 0])
+        array([1.  , 2.5 , 3.  , 2.01, 4.  ,  nan, 1.  ])
+        """
+        (starts, target_values) = np.broadcast_arrays(np.asarray(starts, dtype=float), np.asarray(target_values, dtype=float))
+        if np.any(target_values < 0):
+            raise ValueError("sum out of range (should be positive): {}".format(target_values.min()))
+
+        kernel = kernels.get_backend(self.backend).uniform_mark
+        return kernel(self.region_starts, self.region_ends, self.cumulative_lengths, starts.ravel(), target_values.ravel()).reshape(starts.shape)
+
+
+def merge_regions(regions:List[tuple])->List[tuple]:
+    """
+    Sort the given regions from left to right, and merge regions that overlap.
+
+    :param regions: a list of tuples [(start1,end1), (start2,end2),...], in any order.
+    :return: a sorted list of disjoint regions covering the same points.
+
+    >>> merge_regions([(6,9),(0,1),(2,4)])
+    [(0, 1), (2, 4), (6, 9)]
+    >>> merge_regions([(0,2),(1,3),(5,6),(2.5,4),(3,3.5)])
+    [(0, 4), (5, 6)]
+    """
+    merged = []
+    for (region_start, region_end) in sorted(regions, key=lambda region:region[0]):
+        if len(merged) > 0 and region_start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], region_end))
+        else:
+            merged.append((region_start, region_end))
+    return merged
+
+
+def eval_all(agents:List[Agent], start:float, end:float)->np.ndarray:
+    """
+    Ask all the agents the same Eval query.
+    If agents has its own eval_all method (e.g., an AgentPopulation), the query is forwarded to it.
+
+    :param agents: a list of agents.
+    :param start: Location on cake where the calculation starts.
+    :param end:   Location on cake where the calculation ends.
+    :return: an array whose i-th element is the value of [start,end] for agents[i].
+
+    >>> eval_all([PiecewiseConstantAgent([11,22,33,44]), PiecewiseUniformAgent([(0,1),(2,4),(6,9)])], 1, 3)
+    array([55.,  1.])
+    """
+    if hasattr(agents, "eval_all"):   # e.g. an AgentPopulation, which answers for all agents at once
+        return agents.eval_all(start, end)
+    return np.array([agent.eval(start, end) for agent in agents], dtype=float)
+
+
+def mark_all(agents:List[Agent], start:float, target_values, indices:np.ndarray=None)->np.ndarray:
+    """
+    Ask all the agents a Mark query from the same start.
+    If agents has its own mark_all method (e.g., an AgentPopulation), the query is forwarded to it.
+
+    :param agents: a list of agents.
+    :param start: Location on cake where the calculation starts.
+    :param target_values: the required value - either a single number for all agents, or one number per agent.
+    :param indices: if given, only the agents with these indices are asked (and target_values correspond to them).
+    :return: an array whose i-th element is the mark of agents[i] (or agents[indices[i]]); NaN where the mark would return None.
+
+    >>> mark_all([PiecewiseConstantAgent([11,22,33,44]), PiecewiseUniformAgent([(0,1),(2,4),(6,9)])], 1, [55, 1])
+    array([3., 3.])
+    >>> mark_all([PiecewiseConstantAgent([11,22,33,44]), PiecewiseUniformAgent([(0,1),(2,4),(6,9)])], 1, 10)
+    array([1.45454545,        nan])
+    >>> mark_all([PiecewiseConstantAgent([11,22,33,44]), PiecewiseUniformAgent([(0,1),(2,4),(6,9)])], 1, [1], indices=[1])
+    array([3.])
+    """
+    if hasattr(agents, "mark_all"):   # e.g. an AgentPopulation, which answers for all agents at once
+        return agents.mark_all(start, target_values, indices)
+    if indices is not None:
+        agents = [agents[i] for i in indices]
+    target_values = np.broadcast_to(np.asarray(target_values, dtype=float), (len(agents),))
+    marks = [agent.mark(start, target_value) for (agent, target_value) in zip(agents, target_values)]
+    return np.array([np.nan if mark is None else mark for mark in marks], dtype=float)
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures,tests) = doctest.testmod(report=True)
+    print ("{} failures, {} tests".format(failures,tests))
@@ -0,0 +1,169 @@
+"""
+Defines cake-allocations.
+
+Programmer: Erel Segal-Halevi
+Since: 2019-11
+"""
+
+from typing import *
+from fairpy.agents import Agent
+import numpy as np
+
+
+class Allocation:
+    """
+    An allocation of a cake among agents.
+    This is the output of a cake-cutting algorithm.
+
+    >>> from fairpy.agents import PiecewiseConstantAgent
+    >>> Alice = PiecewiseConstantAgent([33,33], "Alice")
+    >>> George = PiecewiseConstantAgent([11,55], "George")
+    >>> allocation = Allocation([Alice, George])
+    >>> allocation.set_piece(0, [(0,1)])
+    >>> allocation.set_piece(1, [(1,1.5),(1.5,2)])
+    >>> (utilities, matrix) = allocation.values()
+    >>> utilities
+    array([33., 55.])
+    >>> matrix
+    array([[33., 33.],
+           [11., 55.]])
+    """
+
+    def __init__(self, agents:List[Agent]):
+        self.agents = agents
+        self.pieces = [None]*len(agents)
+
+    def set_piece(self, agent_index:int, piece:List[tuple]):
+        """
+        Sets the piece of the given index.
+
+        :param agent_index: index of the agent.
+        :param piece: a list of intervals.
+        """
+        self.pieces[agent_index] = piece
+
+    def intervals(self)->Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: three arrays (starts, ends, owners) with all the intervals of all the pieces;
+                 owners[k] is the index of the agent who gets the interval [starts[k],ends[k]].
+        """
+        intervals = [(start, end, agent_index)
+            for (agent_index, piece) in enumerate(self.pieces) if piece is not None
+            for (start, end) in piece]
+        if len(intervals) == 0:
+            return (np.zeros(0), np.zeros(0), np.zeros(0, dtype=int))
+        (starts, ends, owners) = zip(*intervals)
+        return (np.array(starts, dtype=float), np.array(ends, dtype=float), np.array(owners, dtype=int))
+
+    def values(self)->Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate all the pieces for all the agents, using a single batch query per agent.
+
+        :return: a tuple (utilities, matrix), where matrix[i][j] is the value of the piece of agent j for agent i,
+                 and utilities[i] == matrix[i][i] is the value of agent i for its own piece.
+        """
+        (starts, ends, owners) = self.intervals()
+        num_of_agents = len(self.agents)
+        matrix = np.zeros((num_of_agents, num_of_agents))
+        for (i, agent) in enumerate(self.agents):
+            matrix[i] = np.bincount(owners, weights=agent.eval_many(starts, ends), minlength=num_of_agents)
+        return (np.diag(matrix).copy(), matrix)
+
+    def __repr__(self):
+        s = ""
+        for i in range(len(self.pieces)):
+            agent = self.agents[i]
+            piece = self.pieces[i]
+            # float() since exact agents return a Fraction, which supports the "f" format only since Python 3.12.
+            s += "> {} gets {} with value {:.2f}\n".format(agent.name(), self.pieces[i], float(agent.piece_value(piece)))
+        return s
+
+
+class ColumnarAllocation(Allocation):
+    """
+    An allocation whose intervals are also kept in flat arrays, for allocations among many agents.
+    The intervals of agent i are [starts[k],ends[k]] for k in range(offsets[i], offsets[i+1]).
+
+    set_piece only records the piece, as in Allocation; the arrays are built once, when they are first read,
+    and are rebuilt only if a piece is set after that. Pieces should be changed only through set_piece.
+
+    >>> from fairpy.agents import PiecewiseConstantAgent
+    >>> Alice = PiecewiseConstantAgent([33,33], "Alice")
+    >>> George = PiecewiseConstantAgent([11,55], "George")
+    >>> allocation = ColumnarAllocation([Alice, George])
+    >>> allocation.set_piece(1, [(1,1.5),(1.5,2)])
+    >>> allocation.set_piece(0, [(0,1)])
+    >>> allocation
+    > Alice gets [(0, 1)] with value 33.00
+    > George gets [(1, 1.5), (1.5, 2)] with value 55.00
+    <BLANKLINE>
+    >>> allocation.offsets
+    array([0, 1, 3])
+    >>> allocation.values()[1]
+    array([[33., 33.],
+           [11., 55.]])
+    """
+
+    def __init__(self, agents:List[Agent]):
+        super().__init__(agents)
+        self.__columns = None
+
+    @staticmethod
+    def from_allocation(allocation:Allocation)->"ColumnarAllocation":
+        """
+        Convert a list-based Allocation to a ColumnarAllocation with the same pieces.
+        """
+        columnar = ColumnarAllocation(allocation.agents)
+        columnar.pieces = list(allocation.pieces)
+        return columnar
+
+    def set_piece(self, agent_index:int, piece:List[tuple]):
+        """
+        Sets the piece of the given index.
+
+        :param agent_index: index of the agent.
+        :param piece: a list of intervals.
+        """
+        self.pieces[agent_index] = piece
+        self.__columns = None
+
+    def __build_columns(self):
+        if self.__columns is None:
+            (starts, ends, owners) = Allocation.intervals(self)
+            offsets = np.zeros(len(self.agents)+1, dtype=int)
+            np.cumsum(np.bincount(owners, minlength=len(self.agents)), out=offsets[1:])
+            self.__columns = (starts, ends, owners, offsets)
+        return self.__columns
+
+    @property
+    def starts(self)->np.ndarray:
+        return self.__build_columns()[0]
+
+    @property
+    def ends(self)->np.ndarray:
+        return self.__build_columns()[1]
+
+    @property
+    def offsets(self)->np.ndarray:
+        return self.__build_columns()[3]
+
+    def piece(self, agent_index:int)->List[tuple]:
+        return self.pieces[agent_index]
+
+    def intervals(self)->Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.__build_columns()[:3]
+
+    def utilities(self)->np.ndarray:
+        """
+        :return: an array with the value of each agent for its own piece.
+        """
+        (starts, ends, owners, offsets) = self.__build_columns()
+        return np.array([
+            agent.eval_many(starts[offsets[i]:offsets[i+1]], ends[offsets[i]:offsets[i+1]]).sum()
+            for (i, agent) in enumerate(self.agents)])
+
+    def __repr__(self):
+        s = ""
+        for (i, utility) in enumerate(self.utilities()):
+            s += "> {} gets {} with value {:.2f}\n".format(self.agents[i].name(), self.pieces[i], utility)
+        return s
@@ -0,0 +1,178 @@
+"""
+Solve many independent fair-division instances in parallel, using a pool of worker processes.
+
+The values of the piecewise-constant agents of each chunk of instances are sent to the workers through
+a single shared-memory block, rather than by pickling; other agents are pickled.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from fairpy.allocations import *
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing.shared_memory import SharedMemory
+import itertools, os
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _pack_chunk(chunk:List[List[Agent]]):
+    """
+    Copy the values and cumulative values of all the piecewise-constant agents in the chunk to a new shared-memory block.
+
+    :return: a tuple (shared_memory, size, layout). shared_memory is None if no agent is piecewise-constant.
+             layout[i][j] describes agent j of instance i: either ("shared", position, length, name) or ("pickled", agent).
+    """
+    size = sum(2 * agent.length + 1 for agents in chunk for agent in agents if type(agent) is PiecewiseConstantAgent)
+    shared_memory = SharedMemory(create=True, size=size * 8) if size > 0 else None
+    buffer = np.ndarray((size,), dtype=float, buffer=shared_memory.buf) if size > 0 else None
+    layout = []
+    position = 0
+    for agents in chunk:
+        descriptors = []
+        for agent in agents:
+            if type(agent) is PiecewiseConstantAgent:
+                length = agent.length
+                buffer[position:position+length] = agent.values
+                buffer[position+length:position+2*length+1] = agent.cumulative_values
+                descriptors.append(("shared", position, length, getattr(agent, "my_name", None)))
+                position += 2 * length + 1
+            else:
+                descriptors.append(("pickled", agent))
+        layout.append(descriptors)
+    del buffer
+    return (shared_memory, size, layout)
+
+
+def _unpack_agents(buffer:np.ndarray, descriptors:list)->List[Agent]:
+    agents = []
+    for descriptor in descriptors:
+        if descriptor[0] == "shared":
+            (_, position, length, name) = descriptor
+            agents.append(PiecewiseConstantAgent.from_arrays(
+                buffer[position:position+length], buffer[position+length:position+2*length+1], name))
+        else:
+            agents.append(descriptor[1])
+    return agents
+
+
+def _solve_instance(protocol:Callable, buffer:np.ndarray, descriptors:list)->list:
+    allocation = protocol(_unpack_agents(buffer, descriptors))
+    return [None if piece is None else [(float(start), float(end)) for (start, end) in piece] for piece in allocation.pieces]
+
+
+def _solve_chunk(protocol:Callable, shared_memory_name:str, size:int, layout:list)->list:
+    """
+    Runs in a worker process: solve all the instances of a chunk.
+    :return: a list with the pieces of each instance.
+    """
+    shared_memory = SharedMemory(name=shared_memory_name) if shared_memory_name is not None else None
+    try:
+        buffer = np.ndarray((size,), dtype=float, buffer=shared_memory.buf) if shared_memory is not None else None
+        results = [_solve_instance(protocol, buffer, descriptors) for descriptors in layout]
+        del buffer
+        return results
+    finally:
+        if shared_memory is not None:
+            shared_memory.close()
+
+
+def _release(shared_memory:SharedMemory):
+    if shared_memory is not None:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def _allocations(chunk:List[List[Agent]], results:list)->List[Allocation]:
+    allocations = []
+    for (agents, pieces) in zip(chunk, results):
+        allocation = Allocation(agents)
+        for (index, piece) in enumerate(pieces):
+            if piece is not None:
+                allocation.set_piece(index, piece)
+        allocations.append(allocation)
+    return allocations
+
+
+def solve_many(instances:Iterable[List[Agent]], protocol:Callable[[List[Agent]], Allocation],
+               processes:int=None, chunksize:int=16, ordered:bool=True, max_pending:int=None)->Iterator:
+    """
+    Solve many independent instances in parallel.
+
+    :param instances: an iterable of lists of agents; it may be an unbounded generator.
+    :param protocol: a function that takes a list of agents and returns an Allocation;
+                     it must be picklable, e.g., a module-level function such as last_diminisher.
+    :param processes: number of worker processes (default: the number of cores).
+    :param chunksize: number of instances sent to a worker at once.
+                      Larger chunks have less overhead; smaller chunks balance the load better.
+    :param ordered: True to yield the allocations in the order of the instances;
+                    False to yield pairs (index, allocation) as soon as each chunk is solved.
+    :param max_pending: maximum number of chunks that are sent but not yet yielded (default: twice the number of processes).
+                        When it is reached, no more instances are read until a chunk is yielded,
+                        so the memory is bounded even for unbounded inputs.
+
+    >>> from fairpy.cut_and_choose import symmetric_protocol
+    >>> instances = [[PiecewiseConstantAgent([1, i, 3], "Alice"), PiecewiseUniformAgent([(0, 1), (2, 2+i/20)], "George")] for i in range(1, 21)]
+    >>> allocations = list(solve_many(instances, symmetric_protocol, processes=2, chunksize=3))
+    >>> allocations[1]
+    > Alice gets [(1.275, 3.0)] with value 4.45
+    > George gets [(0.0, 1.275)] with value 1.00
+    <BLANKLINE>
+    >>> [allocation.pieces for allocation in allocations] == [symmetric_protocol(agents).pieces for agents in instances]
+    True
+    >>> sorted(index for (index, allocation) in solve_many(instances, symmetric_protocol, processes=2, chunksize=3, ordered=False))
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19]
+    """
+    processes = processes or os.cpu_count()
+    max_pending = max_pending or 2 * processes
+    instances = iter(instances)
+    pending = deque()   # (future, first index, chunk, shared memory)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        try:
+            first_index = 0
+            while True:
+                chunk = list(itertools.islice(instances, chunksize))
+                if len(chunk) > 0:
+                    (shared_memory, size, layout) = _pack_chunk(chunk)
+                    try:
+                        future = executor.submit(_solve_chunk, protocol,
+                            shared_memory.name if shared_memory is not None else None, size, layout)
+                    except BaseException:
+                        _release(shared_memory)
+                        raise
+                    pending.append((future, first_index, chunk, shared_memory))
+                    first_index += len(chunk)
+                if len(pending) == 0:
+                    break
+                if len(chunk) > 0 and len(pending) < max_pending:
+                    continue
+                # Either the input is exhausted or there are too many pending chunks: yield some results.
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    (finished, _) = wait([item[0] for item in pending], return_when=FIRST_COMPLETED)
+                    done = [item for item in pending if item[0] in finished]
+                    for item in done:
+                        pending.remove(item)
+                for (future, index, chunk, shared_memory) in done:
+                    try:
+                        results = future.result()
+                    finally:
+                        _release(shared_memory)
+                    for (offset, allocation) in enumerate(_allocations(chunk, results)):
+                        yield allocation if ordered else (index + offset, allocation)
+        finally:
+            for (future, index, chunk, shared_memory) in pending:
+                future.cancel()
+            wait([item[0] for item in pending])
+            for (future, index, chunk, shared_memory) in pending:
+                _release(shared_memory)
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
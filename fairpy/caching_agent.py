@@ -0,0 +1,172 @@
+"""
+A decorator that memoizes the answers of an agent to eval and mark queries.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import Agent, PiecewiseConstantAgent
+from collections import OrderedDict
+import numpy as np
+
+
+class CachingAgent(Agent):
+    """
+    A decorator class for agent that remembers the answers to the most recent eval and mark queries,
+    so that identical queries are not sent again to the inner agent.
+    This is useful when the inner agent is expensive, e.g., a remote model or a slow callable.
+
+    >>> a = CachingAgent(PiecewiseConstantAgent([11, 22, 33, 44], "Alice"), maxsize=2)
+    >>> a.name()
+    'Alice'
+    >>> a.eval(1, 3)
+    55.0
+    >>> a.eval(1, 3)
+    55.0
+    >>> a.mark(1, 77)
+    3.5
+    >>> (a.hits, a.misses)
+    (1, 2)
+    >>> a.eval(0, 1)
+    11.0
+    >>> a.mark(1, 77)   # still cached
+    3.5
+    >>> a.eval(1, 3)    # evicted by the previous query
+    55.0
+    >>> (a.hits, a.misses)
+    (2, 4)
+    """
+
+    def __init__(self, agent: Agent, maxsize: int = 4096):
+        """
+        :param agent: An agent whose answers should be cached.
+        :param maxsize: the maximum number of answers kept; the least-recently-used answer is evicted first.
+                        None for an unbounded cache.
+        """
+        assert agent is not None
+        super().__init__(agent.name())
+        self.__agent = agent
+        self.__cache = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__cake_value = agent.cake_value()
+        self.__cake_length = agent.cake_length()
+
+    def cake_value(self):
+        return self.__cake_value
+
+    def cake_length(self):
+        return self.__cake_length
+
+    def cache_size(self)->int:
+        return len(self.__cache)
+
+    def clear_cache(self):
+        self.__cache.clear()
+        self.hits = self.misses = 0
+
+    def __lookup(self, *keys):
+        """
+        Look for the first of the given keys that is in the cache; a lookup counts as a single hit or miss.
+        :return: a tuple (found, answer).
+        """
+        cache = self.__cache
+        for key in keys:
+            if key in cache:
+                cache.move_to_end(key)
+                self.hits += 1
+                return (True, cache[key])
+        self.misses += 1
+        return (False, None)
+
+    def __store(self, key, answer):
+        cache = self.__cache
+        cache[key] = answer
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def eval(self, start: float, end: float):
+        key = ("eval", start, end)
+        (found, answer) = self.__lookup(key)
+        if not found:
+            answer = self.__agent.eval(start, end)
+            self.__store(key, answer)
+        return answer
+
+    def mark(self, start: float, targetValue: float):
+        key = ("mark", start, targetValue)
+        (found, answer) = self.__lookup(key)
+        if not found:
+            answer = self.__agent.mark(start, targetValue)
+            self.__store(key, answer)
+        return answer
+
+    def __query_many(self, kind: str, inner_query, firsts, seconds, nan_for_none: bool):
+        """
+        Answer many queries at once: hits are taken from the cache, and all misses are sent to the inner agent
+        in a single batch query.
+        The float answers of the batch query are kept apart from the answers of the scalar queries (under kind+"_many"),
+        so that a scalar query always returns the answer of the inner agent's scalar query, with its own type;
+        a batch query may use the answers of both.
+        """
+        (firsts, seconds) = np.broadcast_arrays(np.asarray(firsts, dtype=float), np.asarray(seconds, dtype=float))
+        answers = np.empty(firsts.shape, dtype=float)
+        pending = OrderedDict()  # maps each missing query to the indices of its occurrences in this batch
+        for (index, first, second) in zip(range(firsts.size), firsts.flat, seconds.flat):
+            key = (kind + "_many", first, second)
+            if key in pending:
+                self.hits += 1
+                pending[key].append(index)
+                continue
+            (found, answer) = self.__lookup(key, (kind, first, second))
+            if found:
+                answers.flat[index] = np.nan if answer is None else answer
+            else:
+                pending[key] = [index]
+        if len(pending) > 0:
+            (_, missing_firsts, missing_seconds) = zip(*pending.keys())
+            missing_answers = inner_query(np.array(missing_firsts), np.array(missing_seconds))
+            for ((key, indices), answer) in zip(pending.items(), missing_answers.tolist()):
+                answers.flat[indices] = answer
+                self.__store(key, None if nan_for_none and np.isnan(answer) else answer)
+        return answers
+
+    def eval_many(self, starts, ends):
+        """
+        >>> a = CachingAgent(PiecewiseConstantAgent([11, 22, 33, 44]))
+        >>> a.eval(1, 3)
+        55.0
+        >>> a.eval_many([1, 0, 0], [3, 1, 1])
+        array([55., 11., 11.])
+        >>> (a.hits, a.misses)
+        (2, 2)
+
+        A scalar query after a batch query returns the type of the inner agent, not the float of the batch query:
+
+        >>> from fairpy.agents import ExactPiecewiseConstantAgent
+        >>> b = CachingAgent(ExactPiecewiseConstantAgent([11, 22, 33, 44]))
+        >>> b.eval_many([1, 0.5], [3, 2])
+        array([55. , 27.5])
+        >>> b.eval(1, 3), b.eval(0.5, 2)
+        (55, Fraction(55, 2))
+        """
+        return self.__query_many("eval", self.__agent.eval_many, starts, ends, nan_for_none=False)
+
+    def mark_many(self, starts, targetValues):
+        """
+        >>> a = CachingAgent(PiecewiseConstantAgent([11, 22, 33, 44]))
+        >>> a.mark_many([1, 1, 1], [77, 1000, 77])
+        array([3.5, nan, 3.5])
+        >>> a.mark(1, 1000) is None
+        True
+        >>> (a.hits, a.misses)
+        (1, 3)
+        """
+        return self.__query_many("mark", self.__agent.mark_many, starts, targetValues, nan_for_none=True)
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
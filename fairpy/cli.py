@@ -0,0 +1,188 @@
+"""
+Command-line interface: run a cake-cutting protocol on agents loaded from a file, and print the allocation as JSON.
+
+    fairpy --protocol last_diminisher agents.json
+    fairpy --protocol divide --epsilon 0.01 agents.csv
+    fairpy --batch --protocol cut_and_choose instances/*.npy > allocations.jsonl
+
+Input formats (by file extension):
+
+* .json - either a list of agents, or a dict {"agents": [...]}. Each agent is either a list of values
+  (a piecewise-constant agent), or a dict with a "name" and either "values", "values" and "slopes"
+  (a piecewise-linear agent), or "regions" (a piecewise-uniform agent).
+* .csv  - one piecewise-constant agent per row. If the first cell of a row is not a number, it is the agent's name.
+* .npy  - a 2-dimensional array with one piecewise-constant agent per row.
+* .agents - a binary agent-store file (see fairpy/agent_store.py), loaded by memory-mapping.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from fairpy.allocations import *
+import argparse, csv, json, os, sys, time
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def asymmetric_cut_and_choose(agents:List[Agent], epsilon:float)->Allocation:
+    from fairpy.cut_and_choose import asymmetric_protocol
+    return asymmetric_protocol(agents)
+
+def symmetric_cut_and_choose(agents:List[Agent], epsilon:float)->Allocation:
+    from fairpy.cut_and_choose import symmetric_protocol
+    return symmetric_protocol(agents)
+
+def last_diminisher(agents:List[Agent], epsilon:float)->Allocation:
+    from fairpy.last_diminisher import last_diminisher
+    return last_diminisher(agents)
+
+def socially_efficient_divide(agents:List[Agent], epsilon:float)->Allocation:
+    from fairpy.socially_efficient_cake_divisions import divide
+    return divide(agents, epsilon)
+
+PROTOCOLS = {
+    "cut_and_choose": asymmetric_cut_and_choose,
+    "symmetric_cut_and_choose": symmetric_cut_and_choose,
+    "last_diminisher": last_diminisher,
+    "divide": socially_efficient_divide,
+}
+
+
+def agent_from_json(agent, index:int)->Agent:
+    """
+    >>> agent_from_json([1, 2, 3], 0)
+    Agent #0 is a piecewise-constant agent with values [1 2 3] and total value=6
+    >>> agent_from_json({"name": "Alice", "regions": [[0, 1], [3, 6]]}, 0)
+    Alice is a piecewise-uniform agent with desired regions [(0, 1), (3, 6)] and total value=4
+    >>> agent_from_json({"name": "Bob", "values": [1, 2], "slopes": [0, 2]}, 1)
+    Bob is a piecewise-linear agent with values [1. 2.], slopes [0. 2.] and total value=3
+    """
+    if isinstance(agent, list):
+        return PiecewiseConstantAgent(agent, "Agent #{}".format(index))
+    name = agent.get("name", "Agent #{}".format(index))
+    if "values" in agent and "slopes" in agent:
+        return PiecewiseLinearAgent(agent["values"], agent["slopes"], name)
+    if "values" in agent:
+        return PiecewiseConstantAgent(agent["values"], name)
+    if "regions" in agent:
+        return PiecewiseUniformAgent([tuple(region) for region in agent["regions"]], name)
+    raise ValueError("Agent #{} has neither 'values' nor 'regions'".format(index))
+
+
+def load_agents(filename:str)->List[Agent]:
+    """
+    Load a list of agents from a .json, .csv, .npy or .agents file.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".json":
+        with open(filename) as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            data = data["agents"]
+        return [agent_from_json(agent, index) for (index, agent) in enumerate(data)]
+    elif extension == ".csv":
+        agents = []
+        with open(filename, newline="") as file:
+            for row in csv.reader(file):
+                if len(row) == 0:
+                    continue
+                try:
+                    float(row[0])
+                    name = "Agent #{}".format(len(agents))
+                except ValueError:
+                    (name, row) = (row[0], row[1:])
+                agents.append(PiecewiseConstantAgent([float(cell) for cell in row], name))
+        return agents
+    elif extension == ".npy":
+        matrix = np.load(filename, mmap_mode="r")
+        return [PiecewiseConstantAgent.from_arrays(row, name="Agent #{}".format(index)) for (index, row) in enumerate(matrix)]
+    elif extension == ".agents":
+        from fairpy.agent_store import load_agents as load_agent_store
+        return load_agent_store(filename)
+    else:
+        raise ValueError("Unknown input format: {}".format(filename))
+
+
+def allocation_to_json(allocation:Allocation)->dict:
+    """
+    :return: a JSON-serializable dict with the piece and value of each agent.
+
+    >>> allocation = Allocation([PiecewiseConstantAgent([1, 2, 3], "Alice")])
+    >>> allocation.set_piece(0, [(0, 1.5)])
+    >>> allocation_to_json(allocation)
+    {'pieces': [{'agent': 'Alice', 'piece': [[0.0, 1.5]], 'value': 2.0}]}
+    """
+    (utilities, matrix) = allocation.values()
+    return {"pieces": [{
+        "agent": agent.name(),
+        "piece": [[float(start), float(end)] for (start, end) in (piece or [])],
+        "value": float(utility),
+    } for (agent, piece, utility) in zip(allocation.agents, allocation.pieces, utilities)]}
+
+
+def run(filename:str, protocol:str, epsilon:float)->dict:
+    """
+    Run the given protocol on the agents in the given file.
+    :return: a JSON-serializable dict with the input file, the protocol, the allocation and the run time.
+    """
+    start_time = time.perf_counter()
+    agents = load_agents(filename)
+    allocation = PROTOCOLS[protocol](agents, epsilon)
+    result = {"input": filename, "protocol": protocol}
+    result.update(allocation_to_json(allocation))
+    result["seconds"] = time.perf_counter() - start_time
+    return result
+
+
+def input_files(filenames:List[str])->Iterator[str]:
+    """
+    :return: the given file names; "-" is replaced by the file names read from the standard input, one per line.
+    """
+    for filename in filenames:
+        if filename == "-":
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.strip()
+        else:
+            yield filename
+
+
+def main(argv=None)->int:
+    parser = argparse.ArgumentParser(prog="fairpy", description="Run a cake-cutting protocol on agents loaded from files.")
+    parser.add_argument("inputs", nargs="+", help="input files (.json, .csv, .npy or .agents); in batch mode, '-' reads file names from stdin")
+    parser.add_argument("--protocol", "-p", choices=sorted(PROTOCOLS), default="last_diminisher")
+    parser.add_argument("--epsilon", "-e", type=float, default=0.1, help="the approximation parameter of 'divide'")
+    parser.add_argument("--batch", action="store_true",
+        help="process many inputs in this process, and print one JSON line per input; errors are reported per input")
+    parser.add_argument("--output", "-o", help="write the output to this file instead of the standard output")
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        if not args.batch:
+            if len(args.inputs) != 1:
+                parser.error("exactly one input is required without --batch")
+            json.dump(run(args.inputs[0], args.protocol, args.epsilon), output, indent=2)
+            output.write("\n")
+            return 0
+        num_of_errors = 0
+        for filename in input_files(args.inputs):
+            try:
+                result = run(filename, args.protocol, args.epsilon)
+            except Exception as error:
+                num_of_errors += 1
+                result = {"input": filename, "protocol": args.protocol, "error": "{}: {}".format(type(error).__name__, error)}
+            output.write(json.dumps(result) + "\n")
+        return 1 if num_of_errors > 0 else 0
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
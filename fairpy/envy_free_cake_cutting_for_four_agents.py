@@ -1,7 +1,7 @@
-from agents import *
-from allocations import *
+from fairpy.agents import *
+from fairpy.allocations import *
 from typing import *
-from cut_and_choose import asymmetric_protocol
+from fairpy.cut_and_choose import asymmetric_protocol
 
 
 def main_protocol(agents: List[Agent]):
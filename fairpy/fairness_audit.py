@@ -0,0 +1,106 @@
+"""
+Audit the fairness of a cake-allocation:
+envy, proportionality and welfare, computed from the full valuation matrix.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from fairpy.allocations import *
+from typing import *
+
+import numpy as np
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE = 1e-9
+
+
+def envy_matrix(matrix:np.ndarray)->np.ndarray:
+    """
+    :param matrix: a valuation matrix, where matrix[i][j] is the value of agent i for the piece of agent j.
+    :return: a matrix in which envy[i][j] is the amount by which agent i envies agent j (negative if no envy).
+
+    >>> envy_matrix(np.array([[3., 5.], [1., 2.]]))
+    array([[ 0.,  2.],
+           [-1.,  0.]])
+    """
+    return matrix - np.diag(matrix)[:, np.newaxis]
+
+
+def envy_pairs(matrix:np.ndarray, tolerance:float=DEFAULT_TOLERANCE)->List[Tuple[int,int]]:
+    """
+    :return: a list of all pairs (i,j) such that agent i envies agent j by more than the tolerance.
+
+    >>> envy_pairs(np.array([[3., 5.], [1., 2.]]))
+    [(0, 1)]
+    >>> envy_pairs(np.array([[3., 5.], [1., 2.]]), tolerance=2)
+    []
+    """
+    (envious, envied) = np.nonzero(envy_matrix(matrix) > tolerance)
+    return list(zip(envious.tolist(), envied.tolist()))
+
+
+def proportionality_violations(agents:List[Agent], utilities:np.ndarray, tolerance:float=DEFAULT_TOLERANCE)->List[int]:
+    """
+    :return: a list of the indices of all agents whose value is smaller than 1/n of their value of the entire cake.
+
+    >>> Alice = PiecewiseConstantAgent([33,33], "Alice")
+    >>> George = PiecewiseConstantAgent([11,55], "George")
+    >>> proportionality_violations([Alice, George], np.array([33., 11.]))
+    [1]
+    """
+    proportional_shares = np.array([agent.cake_value() for agent in agents]) / len(agents)
+    return np.nonzero(utilities < proportional_shares - tolerance)[0].tolist()
+
+
+def audit(allocation:Allocation, tolerance:float=DEFAULT_TOLERANCE)->dict:
+    """
+    Audit a given allocation.
+
+    :param allocation: an allocation of a cake among agents.
+    :param tolerance: differences up to this amount are not considered violations.
+    :return: a dict with the valuation matrix, the envy pairs, the maximum envy,
+             the proportionality violations, and the utilitarian and egalitarian welfare.
+
+    >>> Alice = PiecewiseConstantAgent([33,33], "Alice")
+    >>> George = PiecewiseConstantAgent([11,55], "George")
+    >>> allocation = Allocation([Alice, George])
+    >>> allocation.set_piece(0, [(1,2)])
+    >>> allocation.set_piece(1, [(0,1)])
+    >>> report = audit(allocation)
+    >>> report["envy_pairs"]
+    [(1, 0)]
+    >>> report["max_envy"]
+    44.0
+    >>> report["proportionality_violations"]
+    [1]
+    >>> report["envy_free"], report["proportional"]
+    (False, False)
+    >>> report["utilitarian_welfare"], report["egalitarian_welfare"]
+    (44.0, 11.0)
+    """
+    (utilities, matrix) = allocation.values()
+    envy = envy_matrix(matrix)
+    pairs = envy_pairs(matrix, tolerance)
+    violations = proportionality_violations(allocation.agents, utilities, tolerance)
+    max_envy = float(max(envy.max(), 0)) if len(utilities) > 0 else 0.0
+    logger.info("%d envy pairs, %d proportionality violations", len(pairs), len(violations))
+    return {
+        "matrix": matrix,
+        "utilities": utilities,
+        "envy_pairs": pairs,
+        "max_envy": max_envy,
+        "envy_free": len(pairs) == 0,
+        "proportionality_violations": violations,
+        "proportional": len(violations) == 0,
+        "utilitarian_welfare": float(utilities.sum()),
+        "egalitarian_welfare": float(utilities.min()) if len(utilities) > 0 else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
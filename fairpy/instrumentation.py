@@ -0,0 +1,242 @@
+"""
+Instrumentation of the Robertson-Webb query interface:
+counting the eval and mark queries of each agent in each phase of a protocol, and measuring their latency.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from collections import defaultdict
+from contextlib import contextmanager
+import numpy as np
+import bisect, json, time
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Upper edges (in seconds) of the buckets of the latency histograms.
+LATENCY_BUCKETS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1, float("inf")]
+
+
+class QueryLog:
+    """
+    Collects the queries answered by instrumented agents.
+    Queries are counted per agent, per protocol phase and per query type ("eval" or "mark");
+    a batch query of k intervals counts as k queries.
+    Each instrumented agent gets an index in the log, so agents with the same name (e.g. "Anonymous") are counted separately;
+    the names are used only for display.
+    The latency of each query type is kept as running aggregates, so the memory does not grow with the number of queries.
+
+    >>> log = QueryLog()
+    >>> agents = log.instrument([PiecewiseConstantAgent([11,22,33,44], "Alice"), PiecewiseConstantAgent([44,33,22,11], "George")])
+    >>> with log.phase("cut"):
+    ...     agents[0].mark(0, 66)
+    3.0
+    >>> with log.phase("choose"):
+    ...     agents[1].partition_values([3])
+    [99.0, 11.0]
+    >>> log.count()
+    3
+    >>> log.count(query_type="eval")
+    2
+    >>> log.count(agent=1)
+    2
+    >>> log.count(phase="cut", query_type="mark")
+    1
+    >>> log.counts()
+    {0: {'cut': {'mark': 1}}, 1: {'choose': {'eval': 2}}}
+    >>> log.agent_names()
+    ['Alice', 'George']
+
+    >>> log = QueryLog()
+    >>> anonymous = log.instrument([PiecewiseConstantAgent([1,2]), PiecewiseConstantAgent([3,4])])
+    >>> (anonymous[0].eval(0,1), anonymous[1].eval(0,1), anonymous[1].eval(1,2))
+    (1.0, 3.0, 4.0)
+    >>> log.counts(), log.agent_names()
+    ({0: {None: {'eval': 1}}, 1: {None: {'eval': 2}}}, ['Anonymous', 'Anonymous'])
+    """
+
+    def __init__(self):
+        self.__counts = defaultdict(int)  # maps (agent index, phase, query type) to a number of queries
+        self.__latencies = {}             # maps a query type to running aggregates of its call durations (in seconds)
+        self.__agent_names = []
+        self.__phases = []
+
+    def add_agent(self, agent_name:str)->int:
+        """
+        Register a new instrumented agent.
+        :return: the index of the agent in this log.
+        """
+        self.__agent_names.append(agent_name)
+        return len(self.__agent_names) - 1
+
+    def agent_names(self)->List[str]:
+        """
+        :return: the names of the registered agents, by their index.
+        """
+        return list(self.__agent_names)
+
+    def current_phase(self)->str:
+        return "/".join(self.__phases) if len(self.__phases) > 0 else None
+
+    @contextmanager
+    def phase(self, name:str):
+        """
+        A context manager for a phase of a protocol. Phases may be nested; the name of a nested phase is "outer/inner".
+        """
+        self.__phases.append(name)
+        try:
+            yield self
+        finally:
+            self.__phases.pop()
+
+    def record(self, agent_index:int, query_type:str, num_of_queries:int, duration:float, batch:bool=False):
+        """
+        Record a call of the agent with the given index, that answered num_of_queries queries of the given type ("eval" or "mark").
+        The duration of a batch call is recorded separately, under "eval_many" or "mark_many".
+        """
+        self.__counts[(agent_index, self.current_phase(), query_type)] += num_of_queries
+        call_type = query_type + "_many" if batch else query_type
+        latency = self.__latencies.get(call_type)
+        if latency is None:
+            latency = self.__latencies[call_type] = {
+                "calls": 0, "total_seconds": 0.0, "min_seconds": float("inf"), "max_seconds": 0.0,
+                "histogram": [0] * len(LATENCY_BUCKETS)}
+        latency["calls"] += 1
+        latency["total_seconds"] += duration
+        latency["min_seconds"] = min(latency["min_seconds"], duration)
+        latency["max_seconds"] = max(latency["max_seconds"], duration)
+        latency["histogram"][min(bisect.bisect_left(LATENCY_BUCKETS, duration), len(LATENCY_BUCKETS) - 1)] += 1
+
+    def instrument(self, agents:List[Agent])->List["InstrumentedAgent"]:
+        """
+        :return: a list of agents that answer the same queries as the given agents, and record them in this log.
+        """
+        return [InstrumentedAgent(agent, self) for agent in agents]
+
+    def count(self, agent:int=None, phase:str=None, query_type:str=None)->int:
+        """
+        :return: the number of queries that match the given agent index, phase and query type (None matches all).
+        """
+        return sum(number for ((agent_index, phase_name, query_name), number) in self.__counts.items()
+            if (agent is None or agent == agent_index)
+            and (phase is None or phase == phase_name)
+            and (query_type is None or query_type == query_name))
+
+    def counts(self)->dict:
+        """
+        :return: a nested dict: agent index -> phase -> query type -> number of queries.
+        """
+        result = {}
+        for ((agent_index, phase_name, query_name), number) in self.__counts.items():
+            result.setdefault(agent_index, {}).setdefault(phase_name, {})[query_name] = number
+        return result
+
+    def histograms(self)->dict:
+        """
+        :return: a dict that maps each query type to the number of calls in each latency bucket.
+                 The calls are counted per call, so a batch query is a single call.
+        """
+        return {query_type: list(latency["histogram"]) for (query_type, latency) in self.__latencies.items()}
+
+    def summary(self)->dict:
+        """
+        :return: a dict with the total number of queries, the agent names, the counts, and the latency statistics of each query type.
+
+        >>> log = QueryLog()
+        >>> agent = InstrumentedAgent(PiecewiseConstantAgent([11,22,33,44]), log)
+        >>> agent.eval_many([0,1,2], [1,2,3])
+        array([11., 22., 33.])
+        >>> summary = log.summary()
+        >>> summary["total"], summary["agents"], summary["counts"]
+        (3, ['Anonymous'], {0: {None: {'eval': 3}}})
+        >>> summary["latency"]["eval_many"]["calls"]
+        1
+        >>> sum(summary["latency"]["eval_many"]["histogram"])
+        1
+        """
+        latency = {query_type: {
+            "calls": latency["calls"],
+            "total_seconds": latency["total_seconds"],
+            "mean_seconds": latency["total_seconds"] / latency["calls"],
+            "min_seconds": latency["min_seconds"],
+            "max_seconds": latency["max_seconds"],
+            "histogram": list(latency["histogram"]),
+        } for (query_type, latency) in self.__latencies.items()}
+        return {
+            "total": self.count(),
+            "agents": self.agent_names(),
+            "counts": self.counts(),
+            "latency": latency,
+            "latency_buckets": LATENCY_BUCKETS,
+        }
+
+    def to_json(self, **kwargs)->str:
+        summary = self.summary()
+        summary["latency_buckets"] = [str(edge) for edge in LATENCY_BUCKETS]
+        return json.dumps(summary, **kwargs)
+
+    def clear(self):
+        self.__counts.clear()
+        self.__latencies.clear()
+
+
+class InstrumentedAgent(Agent):
+    """
+    A decorator class for agent that records every eval and mark query in a QueryLog.
+
+    >>> log = QueryLog()
+    >>> a = InstrumentedAgent(PiecewiseConstantAgent([11,22,33,44], "Alice"), log)
+    >>> a.eval(1,3)
+    55.0
+    >>> a.mark(1, 77)
+    3.5
+    >>> a.mark_many([0, 0], [11, 1000])
+    array([ 1., nan])
+    >>> log.counts()
+    {0: {None: {'eval': 1, 'mark': 3}}}
+    """
+
+    def __init__(self, agent: Agent, log: QueryLog):
+        assert agent is not None
+        super().__init__(agent.name())
+        self.__agent = agent
+        self.log = log
+        self.index = log.add_agent(agent.name())
+
+    def cake_value(self):
+        return self.__agent.cake_value()
+
+    def cake_length(self):
+        return self.__agent.cake_length()
+
+    def eval(self, start: float, end: float):
+        start_time = time.perf_counter()
+        value = self.__agent.eval(start, end)
+        self.log.record(self.index, "eval", 1, time.perf_counter() - start_time)
+        return value
+
+    def mark(self, start: float, targetValue: float):
+        start_time = time.perf_counter()
+        end = self.__agent.mark(start, targetValue)
+        self.log.record(self.index, "mark", 1, time.perf_counter() - start_time)
+        return end
+
+    def eval_many(self, starts, ends):
+        start_time = time.perf_counter()
+        values = self.__agent.eval_many(starts, ends)
+        self.log.record(self.index, "eval", np.size(values), time.perf_counter() - start_time, batch=True)
+        return values
+
+    def mark_many(self, starts, targetValues):
+        start_time = time.perf_counter()
+        ends = self.__agent.mark_many(starts, targetValues)
+        self.log.record(self.index, "mark", np.size(ends), time.perf_counter() - start_time, batch=True)
+        return ends
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
@@ -0,0 +1,349 @@
+"""
+Kernels for the batch queries (eval_many and mark_many) of piecewise agents.
+There are several interchangeable backends:
+
+* "numpy"  - vectorized NumPy calculations (the default).
+* "python" - a plain loop over the queries, using the same calculation as the scalar eval and mark.
+* "numba"  - the loops of the "python" backend, compiled by numba. Available only if numba is installed;
+             it is imported and compiled only when first used.
+
+The backend can be selected globally, by set_backend, or per agent, by setting agent.backend.
+
+All kernels get one-dimensional arrays of queries, and return an array of answers (NaN where mark would return None).
+
+Programmer: agent
+Since: 2026-10
+"""
+
+import numpy as np
+import math
+from typing import *
+
+
+def _search(array, x, lo:int, hi:int, right:bool)->int:
+    """
+    Binary search in the sorted array[lo:hi]: the same as bisect.bisect_right if right, else bisect.bisect_left.
+    """
+    while lo < hi:
+        middle = (lo + hi) // 2
+        if (array[middle] <= x) if right else (array[middle] < x):
+            lo = middle + 1
+        else:
+            hi = middle
+    return lo
+
+
+### Loop kernels: the same calculations as the scalar queries, one query at a time.
+
+def _constant_eval_loop(values, cumulative_values, starts, ends, out):
+    length = len(values)
+    for k in range(len(starts)):
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        start = max(0.0, min(starts[k], length))
+        end = max(0.0, min(ends[k], length))
+        if end <= start:
+            out[k] = 0.0
+            continue
+        from_floor = int(math.floor(start))
+        to_ceiling = int(math.ceil(end))
+        value = values[from_floor] * (from_floor + 1 - start)
+        if to_ceiling > from_floor + 1:
+            value += cumulative_values[to_ceiling] - cumulative_values[from_floor + 1]
+        value -= values[to_ceiling - 1] * (to_ceiling - end)
+        out[k] = value
+    return out
+
+
+def _constant_mark_loop(values, cumulative_values, starts, target_values, out):
+    length = len(values)
+    for k in range(len(starts)):
+        start = max(0.0, starts[k])
+        target_value = target_values[k]
+        if start >= length:
+            out[k] = np.nan
+            continue
+        if target_value == 0:
+            out[k] = start
+            continue
+        start_floor = int(start)
+        goal = cumulative_values[start_floor] + values[start_floor] * (start - start_floor) + target_value
+        if goal > cumulative_values[length]:
+            out[k] = np.nan
+            continue
+        i = max(_search(cumulative_values, goal, 0, length + 1, False) - 1, start_floor)
+        if i == start_floor:
+            out[k] = start + target_value / values[start_floor]
+        else:
+            out[k] = i + (goal - cumulative_values[i]) / values[i]
+    return out
+
+
+def _uniform_eval_loop(region_starts, region_ends, cumulative_lengths, starts, ends, out):
+    num_of_regions = len(region_starts)
+    for k in range(len(starts)):
+        start = starts[k]
+        end = ends[k]
+        if end <= start:
+            out[k] = 0.0
+            continue
+        first = _search(region_starts, start, 0, num_of_regions, True) - 1
+        last = _search(region_starts, end, 0, num_of_regions, True) - 1
+        if last < 0:
+            out[k] = 0.0
+            continue
+        if first == last:
+            out[k] = max(0.0, min(end, region_ends[last]) - max(start, region_starts[last]))
+            continue
+        value = 0.0
+        if first >= 0:
+            value += max(0.0, region_ends[first] - max(start, region_starts[first]))
+        value += cumulative_lengths[last] - cumulative_lengths[first + 1]
+        value += min(end, region_ends[last]) - region_starts[last]
+        out[k] = value
+    return out
+
+
+def _uniform_mark_loop(region_starts, region_ends, cumulative_lengths, starts, target_values, out):
+    num_of_regions = len(region_starts)
+    for k in range(len(starts)):
+        start = starts[k]
+        target_value = target_values[k]
+        containing = _search(region_starts, start, 0, num_of_regions, True) - 1
+        start_value = 0.0
+        if containing >= 0:
+            start_value = cumulative_lengths[containing] + (min(start, region_ends[containing]) - region_starts[containing])
+        i = max(_search(region_ends, start, 0, num_of_regions, False),
+                _search(cumulative_lengths, start_value + target_value, 1, num_of_regions + 1, False) - 1)
+        if i >= num_of_regions:
+            out[k] = np.nan
+        elif start >= region_starts[i]:
+            out[k] = start + target_value
+        else:
+            out[k] = region_starts[i] + (target_value - (cumulative_lengths[i] - start_value))
+    return out
+
+
+### Vectorized kernels.
+
+def _constant_eval_numpy(values, cumulative_values, starts, ends):
+    length = len(values)
+    # the cake to the left of 0 and to the right of length is considered worthless.
+    starts = np.clip(starts, 0, length)
+    ends   = np.clip(ends,   0, length)
+
+    fromFloor = np.minimum(np.floor(starts).astype(int), length - 1)
+    fromFraction = (fromFloor + 1 - starts)
+    toCeiling = np.maximum(np.ceil(ends).astype(int), 1)
+    toCeilingRemovedFraction = (toCeiling - ends)
+
+    vals = values[fromFloor] * fromFraction
+    vals = vals + np.where(toCeiling > fromFloor + 1, cumulative_values[np.maximum(toCeiling, fromFloor + 1)] - cumulative_values[fromFloor + 1], 0)
+    vals = vals - values[toCeiling - 1] * toCeilingRemovedFraction
+    return np.where(ends > starts, vals, 0.0)
+
+
+def _constant_mark_numpy(values, cumulative_values, starts, target_values):
+    length = len(values)
+    # the cake to the left of 0 and to the right of length is considered worthless.
+    starts = np.maximum(starts, 0)
+
+    start_floors = np.minimum(np.floor(starts).astype(int), length - 1)
+    goals = cumulative_values[start_floors] + values[start_floors] * (starts - start_floors) + target_values
+
+    # Find the first segment i whose right end has a cumulative value of at least goal.
+    i = np.searchsorted(cumulative_values, goals, side='left') - 1
+    i = np.clip(i, start_floors, length - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ends = np.where(i == start_floors,
+            starts + target_values / values[start_floors],
+            i + (goals - cumulative_values[i]) / values[i])
+    ends = np.where(target_values == 0, starts, ends)
+    too_high = (starts >= length) | (goals > cumulative_values[-1])
+    return np.where(too_high, np.nan, ends)
+
+
+def _uniform_eval_numpy(region_starts, region_ends, cumulative_lengths, starts, ends):
+    first = np.searchsorted(region_starts, starts, side='right') - 1
+    last = np.searchsorted(region_starts, ends, side='right') - 1
+    first_region = np.maximum(first, 0)
+    last_region = np.maximum(last, 0)
+
+    same_region = np.maximum(0, np.minimum(ends, region_ends[last_region]) - np.maximum(starts, region_starts[last_region]))
+    head = np.where(first >= 0, np.maximum(0, region_ends[first_region] - np.maximum(starts, region_starts[first_region])), 0)
+    middle = cumulative_lengths[last_region] - cumulative_lengths[np.minimum(first + 1, last_region)]
+    tail = np.minimum(ends, region_ends[last_region]) - region_starts[last_region]
+
+    vals = np.where(first == last, same_region, head + middle + tail)
+    return np.where((ends > starts) & (last >= 0), vals, 0.0)
+
+
+def _uniform_mark_numpy(region_starts, region_ends, cumulative_lengths, starts, target_values):
+    num_of_regions = len(region_starts)
+    containing = np.searchsorted(region_starts, starts, side='right') - 1
+    containing_region = np.maximum(containing, 0)
+    start_values = np.where(containing >= 0,
+        cumulative_lengths[containing_region] + (np.minimum(starts, region_ends[containing_region]) - region_starts[containing_region]), 0)
+
+    i = np.maximum(np.searchsorted(region_ends, starts, side='left'),
+                   np.searchsorted(cumulative_lengths, start_values + target_values, side='left') - 1)
+    found = i < num_of_regions
+    i = np.minimum(i, num_of_regions - 1)
+    ends = np.where(starts >= region_starts[i],
+        starts + target_values,
+        region_starts[i] + (target_values - (cumulative_lengths[i] - start_values)))
+    return np.where(found, ends, np.nan)
+
+
+### Backends.
+
+class Backend:
+    """
+    A set of kernels for the batch queries:
+    constant_eval(values, cumulative_values, starts, ends), constant_mark(values, cumulative_values, starts, target_values),
+    uniform_eval(region_starts, region_ends, cumulative_lengths, starts, ends) and
+    uniform_mark(region_starts, region_ends, cumulative_lengths, starts, target_values).
+    """
+    def __init__(self, name:str, constant_eval, constant_mark, uniform_eval, uniform_mark):
+        self.name = name
+        self.constant_eval = constant_eval
+        self.constant_mark = constant_mark
+        self.uniform_eval = uniform_eval
+        self.uniform_mark = uniform_mark
+
+    def __repr__(self):
+        return "{} backend".format(self.name)
+
+
+def _with_output(loop):
+    """
+    :return: a kernel that runs the given loop kernel with a new output array.
+    """
+    def kernel(*arrays):
+        return loop(*arrays, np.empty(len(arrays[-1]), dtype=float))
+    return kernel
+
+
+def _python_backend()->Backend:
+    return Backend("python",
+        _with_output(_constant_eval_loop), _with_output(_constant_mark_loop),
+        _with_output(_uniform_eval_loop), _with_output(_uniform_mark_loop))
+
+
+def _numpy_backend()->Backend:
+    return Backend("numpy", _constant_eval_numpy, _constant_mark_numpy, _uniform_eval_numpy, _uniform_mark_numpy)
+
+
+def _numba_backend()->Backend:
+    import numba, types
+    # The loops call _search through their module globals, so each loop is re-created with
+    # globals in which _search is the compiled version, and then compiled itself.
+    compiled_globals = dict(globals(), _search=numba.njit(_search))
+    def compiled(loop):
+        return _with_output(numba.njit(types.FunctionType(loop.__code__, compiled_globals, loop.__name__)))
+    return Backend("numba",
+        compiled(_constant_eval_loop), compiled(_constant_mark_loop),
+        compiled(_uniform_eval_loop), compiled(_uniform_mark_loop))
+
+
+BACKEND_FACTORIES = {
+    "numpy": _numpy_backend,
+    "python": _python_backend,
+    "numba": _numba_backend,
+}
+_backends = {}
+_default_backend = "numpy"
+
+
+def available_backends()->List[str]:
+    """
+    :return: the names of the backends that can be used here.
+
+    >>> available_backends()[:2]
+    ['numpy', 'python']
+    """
+    names = ["numpy", "python"]
+    try:
+        import importlib.util
+        if importlib.util.find_spec("numba") is not None:
+            names.append("numba")
+    except ImportError:
+        pass
+    return names
+
+
+def get_backend(name:str=None)->Backend:
+    """
+    :param name: the name of a backend; None for the global backend.
+    :return: the backend with the given name.
+
+    >>> get_backend("python")
+    python backend
+    >>> get_backend("fortran")
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown backend 'fortran'; available backends: numpy, python...
+    """
+    if name is None:
+        name = _default_backend
+    if name not in _backends:
+        if name not in BACKEND_FACTORIES:
+            raise ValueError("Unknown backend '{}'; available backends: {}".format(name, ", ".join(available_backends())))
+        _backends[name] = BACKEND_FACTORIES[name]()
+    return _backends[name]
+
+
+def set_backend(name:str):
+    """
+    Set the global backend, which is used by all agents whose backend attribute is None.
+
+    >>> set_backend("python")
+    >>> get_backend()
+    python backend
+    >>> set_backend("numpy")
+    """
+    global _default_backend
+    get_backend(name)   # raises an error if the backend is not available
+    _default_backend = name
+
+
+def cross_check(agent, starts, ends_or_targets, query:str="eval")->dict:
+    """
+    Answer the same batch query with all available backends, and compare the answers to the scalar queries.
+
+    :param query: "eval" or "mark".
+    :return: a dict that maps each backend name to True if all its answers equal the scalar answers.
+
+    >>> from fairpy.agents import PiecewiseConstantAgent, PiecewiseUniformAgent
+    >>> a = PiecewiseConstantAgent([11,22,33,44])
+    >>> all(cross_check(a, [1, 1.5, 1, 1.5, 3, 3, -1], [3, 3, 3.25, 3.25, 3, 7, 7], "eval").values())
+    True
+    >>> all(cross_check(a, [1, 1.5, 1, 1.5, 1, 1, 1, 4], [55, 44, 66, 55, 99, 100, 0, 1], "mark").values())
+    True
+    >>> b = PiecewiseUniformAgent([(0,1),(2,4),(6,9)])
+    >>> all(cross_check(b, [0, -1, 0.5, 0.5, 0.5, 1.5, 3, 3], [1, 1.5, 1.5, 2.5, 4.5, 11, 11, 1], "eval").values())
+    True
+    >>> all(cross_check(b, [0, 0, 0.5, 1.5, 1.5, 1, 1], [1, 1.5, 1.5, 0.01, 2, 100, 0], "mark").values())
+    True
+    >>> c = PiecewiseConstantAgent([3, 0, 0, 5, 1])
+    >>> all(cross_check(c, [0, 0.5, 1, 1.5, 2.5, 4.5], [4, 3, 5, 0, 5, 3], "mark").values())
+    True
+    """
+    scalar_query = agent.eval if query == "eval" else agent.mark
+    scalar_answers = [scalar_query(first, second) for (first, second) in zip(starts, ends_or_targets)]
+    scalar_answers = np.array([np.nan if answer is None else answer for answer in scalar_answers], dtype=float)
+    saved_backend = agent.backend
+    results = {}
+    try:
+        for name in available_backends():
+            agent.backend = name
+            batch_query = agent.eval_many if query == "eval" else agent.mark_many
+            results[name] = bool(np.array_equal(batch_query(starts, ends_or_targets), scalar_answers, equal_nan=True))
+    finally:
+        agent.backend = saved_backend
+    return results
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
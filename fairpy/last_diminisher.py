@@ -0,0 +1,259 @@
+"""
+Implementation of the Last Diminisher protocol
+for fair cake-cutting among n agents.
+
+Reference:
+
+    Hugo Steinhaus (1948):
+    ["The problem of fair division"](https://www.jstor.org/stable/1914289).
+    Econometrica. 16 (1): 101–104.
+
+Programmer: Erel Segal-Halevi
+Since: 2019-12
+"""
+
+from fairpy.agents import *
+from fairpy.allocations import *
+from fairpy.population import AgentPopulation
+from typing import *
+
+import logging
+logger = logging.getLogger(__name__)
+
+def last_diminisher(agents: List[Agent])->Allocation:
+    """
+    :param agents: a list of Agent objects.
+    :return: a proportional cake-allocation (a ColumnarAllocation, so that evaluating it among many agents is fast).
+
+    >>> Alice = PiecewiseConstantAgent([33,33], "Alice")
+    >>> last_diminisher([Alice])
+    > Alice gets [(0, 2)] with value 66.00
+    <BLANKLINE>
+    >>> George = PiecewiseConstantAgent([11,55], "George")
+    >>> last_diminisher([Alice, George])
+    > Alice gets [(0, 1.0)] with value 33.00
+    > George gets [(1.0, 2)] with value 55.00
+    <BLANKLINE>
+    >>> last_diminisher([George, Alice])
+    > George gets [(1.0, 2)] with value 55.00
+    > Alice gets [(0, 1.0)] with value 33.00
+    <BLANKLINE>
+    >>> Abraham = PiecewiseConstantAgent([4,1,1], "Abraham")
+    >>> last_diminisher([Abraham, George, Alice])
+    > Abraham gets [(0, 0.5)] with value 2.00
+    > George gets [(1.1666666666666667, 2)] with value 45.83
+    > Alice gets [(0.5, 1.1666666666666667)] with value 22.00
+    <BLANKLINE>
+    """
+    num_of_agents = len(agents)
+    if num_of_agents==0:
+        raise ValueError("There must be at least one agent")
+    allocation = ColumnarAllocation(agents)
+    start=0
+    active_agents = list(range(num_of_agents))
+    if hasattr(agents, "mark_all"):   # e.g. an AgentPopulation, which marks for all active agents at once
+        last_diminisher_batch(start, agents, active_agents, allocation)
+    elif on_common_grid(agents):      # the agents can be put in a population, which gives the same marks
+        last_diminisher_batch(start, agents, active_agents, allocation, AgentPopulation.from_agents(agents))
+    else:
+        last_diminisher_iterative(start, agents, active_agents, allocation)
+    return allocation
+
+
+def on_common_grid(agents: List[Agent])->bool:
+    """
+    :return: True if all the agents are piecewise-constant agents with the same number of segments.
+
+    >>> on_common_grid([PiecewiseConstantAgent([1,2]), PiecewiseConstantAgent([3,4])])
+    True
+    >>> on_common_grid([PiecewiseConstantAgent([1,2]), PiecewiseConstantAgent([3,4,5])])
+    False
+    """
+    length = agents[0].cake_length()
+    return all(type(agent) is PiecewiseConstantAgent and agent.length == length for agent in agents)
+
+
+def last_diminisher_iterative(start:float, agents: List[Agent], active_agents:List[int], allocation:Allocation):
+    """
+    An iterative subroutine for last-diminisher, equivalent to last_diminisher_recursive.
+    It does not recurse, so it works for any number of agents.
+    :param start: the leftmost end of the cake that should be allocated.
+    :param agents: the list of all n agents in the original protocol.
+    :param active_agents: list of indices of those agents who are still active (not allocated yet).
+    :param allocation: the current allocation (will be updated during the run).
+    :return: nothing - the allocation is modified in place.
+
+    >>> agents = [PiecewiseConstantAgent([i%7, 1, i%3, 2]) for i in range(100)]
+    >>> allocation = Allocation(agents)
+    >>> last_diminisher_iterative(0, agents, list(range(100)), allocation)
+    >>> recursive_allocation = Allocation(agents)
+    >>> last_diminisher_recursive(0, agents, list(range(100)), recursive_allocation)
+    >>> allocation.pieces == recursive_allocation.pieces
+    True
+    """
+    num_of_agents = len(agents)
+    # The active agents are kept in a linked list of positions in active_agents, so that removing the last diminisher
+    # takes O(1) time, and the agents are still asked in their original order.
+    num_of_active_agents = len(active_agents)
+    following = list(range(1, num_of_active_agents + 1))  # following[p] is the active position after p (the end is num_of_active_agents)
+    preceding = list(range(-1, num_of_active_agents - 1)) # preceding[p] is the active position before p (the head is -1)
+    first = 0
+
+    while num_of_active_agents > 1:
+        logger.info("\n%d agents remain, and allocate the cake starting at %f among them.", num_of_active_agents, start)
+        current_mark = None
+        position = first
+        while position < len(active_agents):
+            next_agent_index = active_agents[position]
+            next_position = position
+            position = following[position]
+            next_agent = agents[next_agent_index]
+            next_agent_mark = next_agent.mark(start, next_agent.cake_value() / num_of_agents)
+            if current_mark is None:
+                logger.info("%s marks at %f", next_agent.name(), next_agent_mark)
+            elif next_agent_mark < current_mark:
+                logger.info("%s diminishes the current mark to %f.", next_agent.name(), next_agent_mark)
+            else:
+                logger.info("%s does not diminish the current mark.", next_agent.name())
+                continue
+            current_mark = next_agent_mark
+            current_marker_index = next_agent_index
+            current_marker_position = next_position
+
+        allocation.set_piece(current_marker_index, [(start, current_mark)])
+        logger.info("%s is the last diminisher, and gets the piece [%f,%f].", agents[current_marker_index].name(), start, current_mark)
+        (before, after) = (preceding[current_marker_position], following[current_marker_position])
+        if before < 0:
+            first = after
+        else:
+            following[before] = after
+        if after < len(active_agents):
+            preceding[after] = before
+        num_of_active_agents -= 1
+        start = current_mark
+
+    remaining_agent_index = active_agents[first]
+    remaining_agent = agents[remaining_agent_index]
+    logger.info("\nOne agent remains (%s), and receives the entire remaining cake starting at %s.", remaining_agent.name(), start)
+    allocation.set_piece(remaining_agent_index, [(start, remaining_agent.cake_length())])
+
+
+def last_diminisher_batch(start:float, agents: List[Agent], active_agents:List[int], allocation:Allocation, population:AgentPopulation=None):
+    """
+    A subroutine for last-diminisher, equivalent to last_diminisher_iterative, for agents that can answer
+    a Mark query for many agents at once (e.g. an AgentPopulation; see mark_all).
+    In each round, all the active agents mark at once, and the last diminisher is the first active agent with the smallest mark.
+    For a plain list of agents, mark_all asks the agents one by one, so last_diminisher_iterative is faster.
+    :param start: the leftmost end of the cake that should be allocated.
+    :param agents: all n agents in the original protocol.
+    :param active_agents: list of indices of those agents who are still active (not allocated yet).
+    :param allocation: the current allocation (will be updated during the run).
+    :param population: a population with the same valuations as the agents, which answers the Mark queries (default: agents).
+    :return: nothing - the allocation is modified in place.
+
+    >>> agents = [PiecewiseConstantAgent([i%7, 1, i%3, 2]) for i in range(100)]
+    >>> allocation = Allocation(agents)
+    >>> last_diminisher_batch(0, agents, list(range(100)), allocation)
+    >>> iterative_allocation = Allocation(agents)
+    >>> last_diminisher_iterative(0, agents, list(range(100)), iterative_allocation)
+    >>> allocation.pieces == iterative_allocation.pieces
+    True
+    >>> population_allocation = Allocation(agents)
+    >>> last_diminisher_batch(0, agents, list(range(100)), population_allocation, AgentPopulation.from_agents(agents))
+    >>> population_allocation.pieces == iterative_allocation.pieces
+    True
+    """
+    num_of_agents = len(agents)
+    if population is None:
+        population = agents
+    active_agents = np.array(active_agents, dtype=int)
+    target_values = np.array([agent.cake_value() for agent in agents]) / num_of_agents
+
+    while len(active_agents) > 1:
+        logger.info("\n%d agents remain, and allocate the cake starting at %f among them.", len(active_agents), start)
+        marks = mark_all(population, start, target_values[active_agents], active_agents)
+        current_position = int(np.nanargmin(marks))
+        if logger.isEnabledFor(logging.INFO):
+            log_diminishers(agents, active_agents, marks)
+
+        current_marker_index = int(active_agents[current_position])
+        current_mark = float(marks[current_position])
+        current_marker = agents[current_marker_index]
+        allocation.set_piece(current_marker_index, [(start, current_mark)])
+        logger.info("%s is the last diminisher, and gets the piece [%f,%f].", current_marker.name(), start, current_mark)
+
+        active_agents = np.delete(active_agents, current_position)
+        start = current_mark
+
+    remaining_agent_index = int(active_agents[0])
+    remaining_agent = agents[remaining_agent_index]
+    logger.info("\nOne agent remains (%s), and receives the entire remaining cake starting at %s.", remaining_agent.name(), start)
+    allocation.set_piece(remaining_agent_index, [(start, remaining_agent.cake_length())])
+
+
+def log_diminishers(agents: List[Agent], active_agents:np.ndarray, marks:np.ndarray):
+    """
+    Log the marks of a single round in the order in which the agents diminish them.
+    """
+    logger.info("%s marks at %f", agents[active_agents[0]].name(), marks[0])
+    current_mark = marks[0]
+    for (next_agent_index, next_agent_mark) in zip(active_agents[1:], marks[1:]):
+        next_agent = agents[next_agent_index]
+        if next_agent_mark < current_mark:
+            logger.info("%s diminishes the current mark to %f.", next_agent.name(), next_agent_mark)
+            current_mark = next_agent_mark
+        else:
+            logger.info("%s does not diminish the current mark.", next_agent.name())
+
+
+def last_diminisher_recursive(start:float, agents: List[Agent], active_agents:List[int], allocation:Allocation):
+    """
+    A recursive subroutine for last-diminisher.
+    It recurses once per agent, so it is limited by Python's recursion limit; last_diminisher uses last_diminisher_iterative.
+    :param start: the leftmost end of the cake that should be allocated.
+    :param agents: the list of all n agents in the original protocol.
+    :param active_agents: list of indices of those agents who are still active (not allocated yet).
+    :param allocation: the current allocation (will be updated during the run).
+    :return: nothing - the allocation is modified in place.
+    """
+    num_of_active_agents = len(active_agents)
+
+    if num_of_active_agents==1:
+        remaining_agent_index = active_agents[0]
+        remaining_agent = agents[remaining_agent_index]
+        logger.info("\nOne agent remains (%s), and receives the entire remaining cake starting at %s.", remaining_agent.name(), start)
+        allocation.set_piece(remaining_agent_index, [(start, remaining_agent.cake_length())])
+        return
+
+    num_of_agents = len(agents)
+    logger.info("\n%d agents remain, and recursively allocate the cake starting at %f among them.", num_of_active_agents, start)
+
+    first_agent_index = active_agents[0]
+    first_agent = agents[first_agent_index]
+    first_agent_mark = first_agent.mark(start, first_agent.cake_value() / num_of_agents)
+    logger.info("%s marks at %f", first_agent.name(), first_agent_mark)
+
+    current_mark = first_agent_mark
+    current_marker_index = first_agent_index
+    for next_agent_index in active_agents[1:]:
+        next_agent = agents[next_agent_index]
+        next_agent_mark = next_agent.mark(start, next_agent.cake_value() / num_of_agents)
+        if next_agent_mark < current_mark:
+            logger.info("%s diminishes the current mark to %f.", next_agent.name(), next_agent_mark)
+            current_mark = next_agent_mark
+            current_marker_index = next_agent_index
+        else:
+            logger.info("%s does not diminish the current mark.", next_agent.name())
+
+    current_marker = agents[current_marker_index]
+    allocation.set_piece(current_marker_index, [(start, current_mark)])
+    logger.info("%s is the last diminisher, and gets the piece [%f,%f].", current_marker.name(), start, current_mark)
+
+    active_agents.remove(current_marker_index)
+    new_start = current_mark
+    last_diminisher_recursive(new_start, agents, active_agents, allocation)
+
+if __name__ == "__main__":
+    import doctest
+    (failures,tests) = doctest.testmod(report=True)
+    print ("{} failures, {} tests".format(failures,tests))
@@ -1,4 +1,5 @@
-from agents import Agent, PiecewiseConstantAgent
+from fairpy.agents import Agent, PiecewiseConstantAgent
+import numpy as np
 
 
 class NormalAgent(Agent):
@@ -25,6 +26,11 @@ class NormalAgent(Agent):
         assert agent is not None
         super().__init__(agent.name())
         self.__agent = agent
+        # The scale factors and the inner queries are captured once, since they are used in every query.
+        self.__length = agent.cake_length()
+        self.__value = agent.cake_value()
+        self.__eval = agent.eval
+        self.__mark = agent.mark
 
     def cake_value(self):
         """
@@ -64,15 +70,12 @@ class NormalAgent(Agent):
         1.0
         """
         # Make sure start and end are in [0, 1]
-        start = min(1.0, max(0.0, start))
-        end = min(1.0, max(0.0, end))
+        start = 0.0 if start < 0.0 else 1.0 if start > 1.0 else start
+        end = 0.0 if end < 0.0 else 1.0 if end > 1.0 else end
 
-        # Adjust the start and the end values to be relative to cake's length of the agent
-        adjusted_start = start * self.__agent.cake_length()
-        adjusted_end = end * self.__agent.cake_length()
-
-        # Gets the value of the piece and normalize it
-        return self.__agent.eval(adjusted_start, adjusted_end) / self.__agent.cake_value()
+        # Adjust the start and the end values to be relative to cake's length of the agent,
+        # and normalize the value of the piece
+        return self.__eval(start * self.__length, end * self.__length) / self.__value
 
     def mark(self, start: float, targetValue: float):
         """
@@ -97,13 +100,34 @@ class NormalAgent(Agent):
         0.25
         """
         # Make sure start and targetValue are in [0, 1]
-        start = min(1.0, max(0.0, start))
-        targetValue = min(1.0, max(0.0, targetValue))
+        start = 0.0 if start < 0.0 else 1.0 if start > 1.0 else start
+        targetValue = 0.0 if targetValue < 0.0 else 1.0 if targetValue > 1.0 else targetValue
+
+        # Adjust the start and the targetValue values to be relative to cake's length and value of the agent,
+        # and normalize the 'end' of the piece
+        end = self.__mark(start * self.__length, targetValue * self.__value)
+        return None if end is None else end / self.__length
+
+    def eval_many(self, starts, ends):
+        """
+        Answer many Eval queries at once, by forwarding them to the batch queries of the inner agent.
+
+        >>> a = NormalAgent(PiecewiseConstantAgent([11, 22, 33, 44]))
+        >>> a.eval_many([0.375, 0.25, 0.375, 1.0, 0.75, -0.25], [0.75, 0.8125, 0.8125, 1.0, 1.75, 1.75])
+        array([0.4, 0.6, 0.5, 0. , 0.4, 1. ])
+        """
+        starts = np.clip(np.asarray(starts, dtype=float), 0.0, 1.0) * self.__length
+        ends = np.clip(np.asarray(ends, dtype=float), 0.0, 1.0) * self.__length
+        return self.__agent.eval_many(starts, ends) / self.__value
 
-        # Adjust the start and the targetValue values to be relative to cake's length and value of the agent
-        adjusted_start = start * self.__agent.cake_length()
-        adjusted_target_value = targetValue * self.__agent.cake_value()
+    def mark_many(self, starts, targetValues):
+        """
+        Answer many Mark queries at once, by forwarding them to the batch queries of the inner agent.
 
-        # Gets the 'end' of the piece and normalize it
-        end = self.__agent.mark(adjusted_start, adjusted_target_value)
-        return None if end is None else end / self.__agent.cake_length()
+        >>> a = NormalAgent(PiecewiseConstantAgent([11, 22, 33, 44]))
+        >>> a.mark_many([0.375, 0.25, 0.375, 0.25, 0.25, 0.25], [0.4, 0.6, 0.5, 0.9, 0.91, 0])
+        array([0.75  , 0.8125, 0.8125, 1.    ,    nan, 0.25  ])
+        """
+        starts = np.clip(np.asarray(starts, dtype=float), 0.0, 1.0) * self.__length
+        targetValues = np.clip(np.asarray(targetValues, dtype=float), 0.0, 1.0) * self.__value
+        return self.__agent.mark_many(starts, targetValues) / self.__length
@@ -0,0 +1,244 @@
+#!python3
+
+"""
+Demonstration of the simplex of partitions.
+
+References:
+
+    Walter Stromquist (1980):
+    "How to cut a cake fairly."
+    The American mathematical monthly, 87(8), 640-644.
+
+    Francis Edward Su (1999):
+    "Rental harmony: Sperner's lemma in fair division."
+    The American mathematical monthly, 106(10), 930-942.
+
+Programmer: Erel Segal-Halevi
+Since: 2019-11
+"""
+
+from fairpy.agents import *
+
+import time, logging
+logger = logging.getLogger(__name__)
+
+class ColorMap:
+    """
+    Represents a map (usually of a triangle) in which each point (x,y) has a certain color (c).
+    """
+    def __init__(self, length: float):
+        self.x_values = []
+        self.y_values = []
+        self.c_values = []  # maps each point-index to the color of that point
+        self.length = length
+
+    def add(self, x, y, c):
+        self.x_values.append(x)
+        self.y_values.append(y)
+        self.c_values.append(c)
+
+    def add_many(self, x_values, y_values, c_values):
+        self.x_values.extend(x_values)
+        self.y_values.extend(y_values)
+        self.c_values.extend(c_values)
+
+    def plot(self, axes, title, scale):
+        import matplotlib.pyplot as pyplot
+        if axes is None:
+            axes = pyplot.axes()
+        axes.scatter(self.x_values, self.y_values, c=self.c_values, s=scale, edgecolors=None)
+        if axes == pyplot:
+            axes = pyplot.axes()
+        axes.set_title(title)
+        axes.set_xticks(np.arange(0, self.length + 1, 1.0))
+        axes.set_yticks(np.arange(0, self.length + 1, 1.0))
+
+
+class RasterColorMap:
+    """
+    A ColorMap backed by a preallocated raster of RGB colors, of shape (samples_per_side, samples_per_side, 3).
+    The pixel at row j and column i holds the color of the point (x,y) = (i*step_length, j*step_length).
+    Pixels of points that were not added remain white.
+
+    >>> colormap = RasterColorMap(4, 4)
+    >>> colormap.add_many([0, 1], [2, 3], [[1, 0, 0], [0, 0, 1]])
+    >>> colormap.pixels.shape
+    (4, 4, 3)
+    >>> colormap.pixels[:, :, 0]
+    array([[1., 1., 1., 1.],
+           [1., 1., 1., 1.],
+           [1., 1., 1., 1.],
+           [1., 0., 1., 1.]])
+    """
+    def __init__(self, length: float, samples_per_side: int):
+        samples_per_side = int(samples_per_side)
+        self.pixels = np.ones((samples_per_side, samples_per_side, 3))
+        self.length = length
+        self.step_length = length / samples_per_side
+
+    def pixel_indices(self, values):
+        return np.clip(np.rint(np.asarray(values) / self.step_length).astype(int), 0, self.pixels.shape[0] - 1)
+
+    def add(self, x, y, c):
+        self.add_many([x], [y], [c])
+
+    def add_many(self, x_values, y_values, c_values):
+        self.pixels[self.pixel_indices(y_values), self.pixel_indices(x_values)] = c_values
+
+    def save(self, filename: str):
+        """
+        Save the raw raster to a .npy file, without using matplotlib.
+        """
+        np.save(filename, self.pixels)
+
+    def plot(self, axes, title, scale=None):
+        import matplotlib.pyplot as pyplot
+        if axes is None:
+            axes = pyplot.axes()
+        half_step = self.step_length / 2
+        extent = (-half_step, self.length - half_step, -half_step, self.length - half_step)
+        axes.imshow(self.pixels, origin='lower', extent=extent, interpolation='nearest')
+        axes.set_title(title)
+        axes.set_xticks(np.arange(0, self.length + 1, 1.0))
+        axes.set_yticks(np.arange(0, self.length + 1, 1.0))
+
+
+# The colors of the leftmost, middle and rightmost pieces: red, green and blue (as RGB).
+PIECE_COLORS = np.array([[1, 0, 0], [0, 128/255, 0], [0, 0, 1]])
+
+
+def simplex_grid(length:float, samples_per_side:float):
+    """
+    Sample the simplex of partitions of a cake into three pieces.
+
+    :param length: the length of the cake.
+    :param samples_per_side: number of samples along each side of the simplex.
+    :return: two arrays (cut1s, cut2s) with all sampled partitions, where cut1s[i] <= cut2s[i].
+
+    >>> simplex_grid(4, 4)
+    (array([0., 0., 0., 1., 1., 2.]), array([0., 1., 2., 1., 2., 2.]))
+    """
+    step_length = length / samples_per_side
+    cuts = np.arange(0, length-step_length, step_length)
+    (cut1_indices, cut2_indices) = np.triu_indices(len(cuts))
+    return (cuts[cut1_indices], cuts[cut2_indices])
+
+
+def best_pieces(agent:Agent, cut1s:np.ndarray, cut2s:np.ndarray)->np.ndarray:
+    """
+    Find the best piece of the agent in many partitions at once.
+
+    :param agent: the agent whose preferences are calculated.
+    :param cut1s, cut2s: arrays of cut-points, e.g. from simplex_grid.
+    :return: an array with the index of the best piece (0=left, 1=middle, 2=right) in each partition [cut1s[i],cut2s[i]].
+
+    >>> best_pieces(PiecewiseConstantAgent([1, 2, 3, 4]), *simplex_grid(4, 4))
+    array([2, 2, 2, 2, 2, 2])
+    """
+    piece_values = np.stack([
+        agent.eval_many(0, cut1s),
+        agent.eval_many(cut1s, cut2s),
+        agent.eval_many(cut2s, agent.cake_length())])
+    return np.argmax(piece_values, axis=0)
+
+
+def colormap_1_agent(agent:Agent, samples_per_side:float, raster:bool=False):
+    """
+    Calculate the partition-simplex of a given agent, without plotting it.
+
+    :param agent: the agent for whom the simplex is calculated.
+    :param samples_per_side: resolution of the simplex.
+    :param raster: True to return a RasterColorMap, False to return a ColorMap (that is plotted by scatter).
+
+    >>> colormap = colormap_1_agent(PiecewiseConstantAgent([1, 2, 3, 4]), 4, raster=True)
+    >>> colormap.pixels[:, :, 2]
+    array([[1., 1., 1., 1.],
+           [1., 1., 1., 1.],
+           [1., 1., 1., 1.],
+           [1., 1., 1., 1.]])
+    >>> colormap.pixels[:, :, 0]
+    array([[0., 1., 1., 1.],
+           [0., 0., 1., 1.],
+           [0., 0., 0., 1.],
+           [1., 1., 1., 1.]])
+    """
+    length = agent.cake_length()
+    start_time = time.time()
+    colormap = RasterColorMap(length, samples_per_side) if raster else ColorMap(length)
+    (cut1s, cut2s) = simplex_grid(length, samples_per_side)
+    colormap.add_many(cut1s, cut2s, PIECE_COLORS[best_pieces(agent, cut1s, cut2s)])
+    logger.info("Color map created in %f seconds", (time.time()-start_time))
+    return colormap
+
+
+def colormap_many_agents(agents:List[Agent], samples_per_side:float, raster:bool=False):
+    """
+    Calculate the partition-simplexes of several different agents, overlayed one above the other, without plotting them.
+
+    :param agents: the agents for whom the simplex is calculated.
+    :param samples_per_side: resolution of the simplex.
+    :param raster: True to return a RasterColorMap, False to return a ColorMap (that is plotted by scatter).
+
+    >>> agents = [PiecewiseConstantAgent([1, 2, 3, 4]), PiecewiseConstantAgent([4, 3, 2, 1])]
+    >>> colormap = colormap_many_agents(agents, 4, raster=True)
+    >>> colormap.pixels[2, 2]
+    array([0.5, 0. , 0.5])
+    """
+    length = max([agent.cake_length() for agent in agents])
+    color_step_per_agent = 1 / len(agents)
+    start_time = time.time()
+    colormap = RasterColorMap(length, samples_per_side) if raster else ColorMap(length)
+    (cut1s, cut2s) = simplex_grid(length, samples_per_side)
+    colors = np.zeros((len(cut1s), 3))
+    point_indices = np.arange(len(cut1s))
+    for agent in agents:
+        colors[point_indices, best_pieces(agent, cut1s, cut2s)] += color_step_per_agent
+    colormap.add_many(cut1s, cut2s, colors)
+    logger.info("Color map created in %f seconds", (time.time()-start_time))
+    return colormap
+
+
+def plot_1_agent(agent:Agent, axes=None, samples_per_side:float=0.01, raster:bool=False):
+    """
+    Plot the partition-simplex of a given agent.
+    The color of each point is determined by the piece that the agent wants in that partition:
+    * red   = leftmost piece;
+    * green = middle piece.
+    * blue  = rightmost piece;
+
+    :param agent: the agent for whom the simplex is plotted.
+    :param axes:  pyplot axes object for plotting on. None to draw on the main axes.
+    :param fractionStep: resolution for creating the simplex.
+    :param raster: True to draw the simplex as an image - much faster for high resolutions.
+    :return:
+    """
+    step_length = agent.cake_length() / samples_per_side
+    colormap = colormap_1_agent(agent, samples_per_side, raster)
+
+    scale = step_length*step_length*20000
+    colormap.plot(axes, "Agent: " + agent.name(), scale)
+
+
+
+def plot_many_agents(agents:List[Agent], axes=None, samples_per_side:float=0.01, raster:bool=False):
+    """
+    Plot the partition-simplexex of several different agents, overlayed one above the other.
+    The color of each point is determined by the piece that each agent wants in that partition:
+    * red   = leftmost piece;
+    * green = middle piece.
+    * blue  = rightmost piece;
+
+    :param agent: the agent for whom the simplex is plotted.
+    :param axes:  pyplot axes object for plotting on. None to draw on the main axes.
+    :param fractionStep: resolution for creating the simplex.
+    :param raster: True to draw the simplex as an image - much faster for high resolutions.
+    :return:
+    """
+    length = max([agent.cake_length() for agent in agents])
+    step_length = length / samples_per_side
+    num_of_agents = len(agents)
+    colormap = colormap_many_agents(agents, samples_per_side, raster)
+
+    scale = step_length*step_length*20000
+    # colormap.plot(axes, "Agents: {}".format([agent.name() for agent in agents]), scale)
+    colormap.plot(axes, "{} agents".format(num_of_agents), scale)
@@ -0,0 +1,371 @@
+"""
+A population of piecewise-constant agents over the same segments, stored in a single 2-dimensional array,
+so that a query can be answered by all agents at once, without a Python loop over the agents.
+
+Programmer: agent
+Since: 2026-10
+"""
+
+from fairpy.agents import *
+from multiprocessing.shared_memory import SharedMemory
+import json, mmap, os, sys
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class AgentPopulation:
+    """
+    A population of piecewise-constant agents whose values are the rows of a single (agents x segments) matrix.
+
+    A population can be used wherever a list of agents is expected: its elements are PiecewiseConstantAgent objects
+    whose arrays are views into the rows of the matrices, and eval_all and mark_all in agents.py
+    forward to the population's own eval_all and mark_all, which answer for all agents at once.
+
+    >>> population = AgentPopulation([[11,22,33,44], [44,33,22,11], [1,1,1,1]], names=["Alice", "George", "Uniform"])
+    >>> len(population)
+    3
+    >>> population[0]
+    Alice is a piecewise-constant agent with values [11. 22. 33. 44.] and total value=110.0
+    >>> population.eval_all(1, 3)
+    array([55., 55.,  2.])
+    >>> population.mark_all(1, [77, 55, 3])
+    array([3.5, 3. , 4. ])
+    >>> eval_all(population, 1, 3)
+    array([55., 55.,  2.])
+    >>> mark_all(population, 1, [55, 2], indices=[1, 2])
+    array([3., 3.])
+
+    A protocol that gets a population uses the fast path, and gives the same results as with separate agents:
+
+    >>> from fairpy.last_diminisher import last_diminisher
+    >>> last_diminisher(population)
+    > Alice gets [(2.1666666666666665, 4)] with value 71.50
+    > George gets [(0, 0.8333333333333333)] with value 36.67
+    > Uniform gets [(0.8333333333333333, 2.1666666666666665)] with value 1.33
+    <BLANKLINE>
+    >>> rng = np.random.default_rng(0)
+    >>> population = AgentPopulation(rng.random((200, 50)))
+    >>> separate_agents = [PiecewiseConstantAgent(row) for row in population.values]
+    >>> last_diminisher(population).pieces == last_diminisher(separate_agents).pieces
+    True
+    >>> from fairpy.socially_efficient_cake_divisions import discretization_procedure
+    >>> discretization_procedure(population, 5) == discretization_procedure(separate_agents, 5)
+    True
+    """
+
+    def __init__(self, values, names:List[str]=None, cumulative_values:np.ndarray=None):
+        """
+        :param values: a 2-dimensional array: values[i][j] is the value of agent i for segment j (the interval [j,j+1]).
+        :param names: an optional list of the agents' names.
+        :param cumulative_values: the prefix sums of each row of values, starting with 0 (calculated if not given).
+                                  A float values matrix and a given cumulative_values matrix are used without copying.
+        """
+        self.values = np.asarray(values, dtype=float)
+        if self.values.ndim != 2:
+            raise ValueError("The values of a population must be a 2-dimensional array, not {}-dimensional".format(self.values.ndim))
+        (num_of_agents, self.length) = self.values.shape
+        if cumulative_values is None:
+            cumulative_values = np.zeros((num_of_agents, self.length + 1))
+            np.cumsum(self.values, axis=1, out=cumulative_values[:, 1:])
+        self.cumulative_values = cumulative_values
+        self.names = names if names is not None else [None] * num_of_agents
+        self._agents = None
+
+    @staticmethod
+    def from_agents(agents:List[PiecewiseConstantAgent])->"AgentPopulation":
+        """
+        Create a population from piecewise-constant agents with the same number of segments.
+
+        >>> population = AgentPopulation.from_agents([PiecewiseConstantAgent([1,2], "Alice"), PiecewiseConstantAgent([3,4])])
+        >>> [agent.name() for agent in population]
+        ['Alice', 'Anonymous']
+        """
+        names = [getattr(agent, "my_name", None) for agent in agents]
+        return AgentPopulation([agent.values for agent in agents], names)
+
+    def agents(self)->List[PiecewiseConstantAgent]:
+        """
+        :return: a list of agents, whose arrays are views into the rows of the population's matrices.
+        """
+        if self._agents is None:
+            self._agents = [
+                PiecewiseConstantAgent.from_arrays(self.values[i], self.cumulative_values[i], self.names[i])
+                for i in range(len(self.values))]
+        return self._agents
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.agents()[index]
+
+    def __iter__(self):
+        return iter(self.agents())
+
+    def cake_values(self)->np.ndarray:
+        return self.cumulative_values[:, -1]
+
+    def __rows(self, indices)->np.ndarray:
+        return np.arange(len(self.values)) if indices is None else np.asarray(indices, dtype=int)
+
+    def eval_all(self, start:float, end:float, indices:np.ndarray=None)->np.ndarray:
+        """
+        Ask all the agents (or the agents with the given indices) the same Eval query,
+        using the same calculation as PiecewiseConstantAgent.eval.
+
+        :return: an array whose i-th element is the value of [start,end] for agent i.
+
+        >>> population = AgentPopulation([[11,22,33,44], [44,33,22,11]])
+        >>> population.eval_all(1.5, 3.25), population.eval_all(-1, 7), population.eval_all(3, 3)
+        (array([55.  , 41.25]), array([110., 110.]), array([0., 0.]))
+        >>> population.eval_all(1, 3, indices=[1])
+        array([55.])
+        """
+        rows = self.__rows(indices)
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        start = max(0, min(start, self.length))
+        end   = max(0, min(end,   self.length))
+        if end <= start:
+            return np.zeros(len(rows))
+
+        fromFloor = math.floor(start)
+        fromFraction = (fromFloor + 1 - start)
+        toCeiling = math.ceil(end)
+        toCeilingRemovedFraction = (toCeiling - end)
+
+        # Only the needed columns of the selected rows are gathered, never whole rows.
+        vals = self.values[rows, fromFloor] * fromFraction
+        if toCeiling > fromFloor + 1:  # the value of the whole segments between fromFloor and toCeiling
+            vals += self.cumulative_values[rows, toCeiling] - self.cumulative_values[rows, fromFloor + 1]
+        vals -= self.values[rows, toCeiling - 1] * toCeilingRemovedFraction
+        return vals
+
+    def mark_all(self, start:float, target_values, indices:np.ndarray=None)->np.ndarray:
+        """
+        Ask all the agents (or the agents with the given indices) a Mark query from the same start,
+        using the same calculation as PiecewiseConstantAgent.mark.
+        The cumulative values of all agents are searched together, by a binary search that advances all rows at once.
+
+        :param target_values: the required value - either a single number for all agents, or one number per agent.
+        :return: an array whose i-th element is the mark of agent i; NaN where the mark would return None.
+
+        >>> population = AgentPopulation([[11,22,33,44], [44,33,22,11]])
+        >>> population.mark_all(1.5, [55, 55]), population.mark_all(1, 0), population.mark_all(4, 1)
+        (array([3.25,  nan]), array([1., 1.]), array([nan, nan]))
+        """
+        rows = self.__rows(indices)
+        values = self.values
+        cumulative_values = self.cumulative_values
+        num_of_rows = len(rows)
+        target_values = np.broadcast_to(np.asarray(target_values, dtype=float), (num_of_rows,))
+        if np.any(target_values < 0):
+            raise ValueError("sum out of range (should be positive): {}".format(target_values.min()))
+        # the cake to the left of 0 and to the right of length is considered worthless.
+        start = max(0, start)
+        if start >= self.length:
+            return np.full(num_of_rows, np.nan)
+
+        start_floor = int(start)
+        start_values = values[rows, start_floor]
+        goals = (cumulative_values[rows, start_floor] + start_values * (start - start_floor)) + target_values
+
+        # Binary search in all rows at once, equivalent to np.searchsorted(cumulative_values[row], goal, side='left').
+        # Each step reads a single entry of each selected row.
+        low = np.zeros(num_of_rows, dtype=int)
+        high = np.full(num_of_rows, self.length + 1)
+        while np.any(low < high):
+            middle = (low + high) // 2
+            smaller = (cumulative_values[rows, np.minimum(middle, self.length)] < goals) & (low < high)
+            low = np.where(smaller, middle + 1, low)
+            high = np.where(smaller | (low >= high), high, middle)
+
+        # Find the first segment i whose right end has a cumulative value of at least goal.
+        i = np.clip(low - 1, start_floor, self.length - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ends = np.where(i == start_floor,
+                start + target_values / start_values,
+                i + (goals - cumulative_values[rows, i]) / values[rows, i])
+        ends = np.where(target_values == 0, float(start), ends)
+        return np.where(goals > cumulative_values[rows, -1], np.nan, ends)
+
+
+_HEADER_SIZE = 3   # number of int64 header fields: agents, segments, length of the names block in bytes
+
+
+# Where Linux exposes the POSIX shared-memory blocks as files.
+_SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+
+class _MappedBlock:
+    """
+    A read-only mapping of an existing shared-memory block, opened as a file,
+    with the part of the SharedMemory interface that SharedAgentPopulation uses.
+    Unlike SharedMemory before Python 3.13, it does not register the block with any resource tracker.
+    """
+
+    def __init__(self, name:str):
+        self.name = name
+        with open(os.path.join(_SHARED_MEMORY_DIRECTORY, name), "rb") as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buf = memoryview(self.__mmap)
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+            self.__mmap.close()
+
+
+def _attach(name:str):
+    """
+    Attach to an existing shared-memory block without registering it with a resource tracker,
+    so that neither the exit of this process nor its resource tracker ever unlinks it
+    (the tracker of a pool worker is shared with the publishing process, which registered the block when creating it).
+    Only the process that created the block unlinks it.
+
+    Before Python 3.13, SharedMemory always registers an attached block, so the block is mapped as a file instead.
+    Where the blocks are not files, SharedMemory is used; its registration is harmless in a worker that shares the
+    publisher's tracker, since the tracker keeps a set of names.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    if os.path.isdir(_SHARED_MEMORY_DIRECTORY):
+        return _MappedBlock(name)
+    return SharedMemory(name=name)
+
+
+class SharedAgentPopulation(AgentPopulation):
+    """
+    An AgentPopulation whose matrices are read-only views into a multiprocessing shared-memory block,
+    so that many processes can use a single copy of the values.
+
+    The block has a header with the number of agents and segments, the values matrix, the cumulative-values matrix,
+    and the agents' names as JSON, so a process can attach to it knowing only its name.
+    Pickling a shared population pickles only this name, so passing it to a worker process does not copy the values.
+
+    The process that publishes the population owns the block, and should unlink it when all processes are done
+    (leaving the "with" block does this). Every process should close its own population before exiting;
+    the per-agent views must not be used after that.
+
+    >>> population = AgentPopulation([[11,22,33,44], [44,33,22,11]], names=["Alice", "George"])
+    >>> with SharedAgentPopulation.publish(population) as shared:
+    ...     attached = SharedAgentPopulation.attach(shared.name)
+    ...     print(attached[0], attached.eval_all(1, 3), attached.values.flags.writeable)
+    ...     attached.close()
+    Alice is a piecewise-constant agent with values [11. 22. 33. 44.] and total value=110.0 [55. 55.] False
+    >>> attached.unlink()
+    Traceback (most recent call last):
+    ...
+    ValueError: Only the process that published a shared population may unlink it
+
+    Worker processes attach to the block when they unpickle the population:
+
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> with SharedAgentPopulation.publish(population) as shared, ProcessPoolExecutor(2) as executor:
+    ...     list(executor.map(eval_all, [shared, shared], [0, 1], [4, 3]))
+    [array([110., 110.]), array([55., 55.])]
+
+    Many workers attach concurrently without disturbing the resource tracker, which shares the standard error
+    of the process that publishes the block:
+
+    >>> import subprocess, sys
+    >>> script = '''
+    ... from fairpy.population import *
+    ... from concurrent.futures import ProcessPoolExecutor
+    ... population = AgentPopulation(np.ones((100, 10)))
+    ... with SharedAgentPopulation.publish(population) as shared, ProcessPoolExecutor(8) as executor:
+    ...     results = list(executor.map(eval_all, [shared] * 64, [0] * 64, [10] * 64))
+    ... print(len(results), results[-1][0])
+    ... '''
+    >>> result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    >>> result.stdout, result.stderr
+    ('64 10.0\\n', '')
+    """
+
+    def __init__(self, shared_memory:SharedMemory, owner:bool=False):
+        """
+        Use publish or attach rather than this constructor.
+        :param shared_memory: a block in the layout written by publish (a SharedMemory, or a mapping made by _attach).
+        :param owner: whether this process created the block (and should unlink it when done).
+        """
+        self.shared_memory = shared_memory
+        self.owner = owner
+        (num_of_agents, num_of_segments, names_size) = np.ndarray((_HEADER_SIZE,), dtype=np.int64, buffer=shared_memory.buf).tolist()
+        values = np.ndarray((num_of_agents, num_of_segments), dtype=float, buffer=shared_memory.buf, offset=_HEADER_SIZE * 8)
+        cumulative_values = np.ndarray((num_of_agents, num_of_segments + 1), dtype=float, buffer=shared_memory.buf,
+            offset=(_HEADER_SIZE + values.size) * 8)
+        values.flags.writeable = False
+        cumulative_values.flags.writeable = False
+        names_offset = (_HEADER_SIZE + values.size + cumulative_values.size) * 8
+        names = json.loads(bytes(shared_memory.buf[names_offset:names_offset + names_size]))
+        super().__init__(values, names, cumulative_values)
+
+    @staticmethod
+    def publish(population:AgentPopulation, name:str=None)->"SharedAgentPopulation":
+        """
+        Copy the population to a new shared-memory block.
+        :param name: the name of the block (a unique name is chosen if not given).
+        :return: the shared population, owned by this process.
+        """
+        names = json.dumps(population.names).encode("utf-8")
+        (num_of_agents, num_of_segments) = population.values.shape
+        size = (_HEADER_SIZE + population.values.size + population.cumulative_values.size) * 8
+        shared_memory = SharedMemory(name=name, create=True, size=size + len(names))
+        header = np.ndarray((_HEADER_SIZE,), dtype=np.int64, buffer=shared_memory.buf)
+        header[:] = (num_of_agents, num_of_segments, len(names))
+        values = np.ndarray(population.values.shape, dtype=float, buffer=shared_memory.buf, offset=_HEADER_SIZE * 8)
+        values[:] = population.values
+        cumulative_values = np.ndarray(population.cumulative_values.shape, dtype=float, buffer=shared_memory.buf,
+            offset=(_HEADER_SIZE + values.size) * 8)
+        cumulative_values[:] = population.cumulative_values
+        shared_memory.buf[size:size + len(names)] = names
+        del header, values, cumulative_values
+        return SharedAgentPopulation(shared_memory, owner=True)
+
+    @staticmethod
+    def attach(name:str)->"SharedAgentPopulation":
+        """
+        :return: a read-only population over the shared-memory block with the given name, published by another process.
+        """
+        return SharedAgentPopulation(_attach(name))
+
+    @property
+    def name(self)->str:
+        return self.shared_memory.name
+
+    def close(self):
+        """
+        Release this process's mapping of the block. All the views into it must have been released before.
+        """
+        if self.shared_memory.buf is None:
+            return
+        self.values = self.cumulative_values = self._agents = None
+        self.shared_memory.close()
+
+    def unlink(self):
+        """
+        Destroy the block. It is freed once all processes have closed it.
+        Only the process that published the block may unlink it.
+        """
+        if not self.owner:
+            raise ValueError("Only the process that published a shared population may unlink it")
+        self.shared_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    def __reduce__(self):
+        # Pickle only the name of the block, so that sending a population to another process does not copy the values.
+        return (SharedAgentPopulation.attach, (self.name,))
+
+
+if __name__ == "__main__":
+    import doctest
+    (failures, tests) = doctest.testmod(report=True)
+    print("{} failures, {} tests".format(failures, tests))
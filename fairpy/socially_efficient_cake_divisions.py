@@ -11,9 +11,8 @@ Programmer: Jonathan Diamant
 Since: 2019-12
 """
 
-from agents import *
-from allocations import *
-import sys
+from fairpy.agents import *
+from fairpy.allocations import *
 
 import logging
 logger = logging.getLogger(__name__)
@@ -43,32 +42,45 @@ def discretization_procedure(agents: List[Agent], epsilon:float):
     [0, 0.667, 1.25, 1.75, 2.25, 2.65, 3]
     """
 
+    return list(discretization_points(agents, epsilon))
+
+
+def discretization_points(agents: List[Agent], epsilon:float):
+    """
+    a generator version of discretization_procedure: yields the cut positions one by one,
+    so that fine discretizations can be consumed as a stream (e.g. by get_players_valuation).
+    in each step, all the agents are asked the same queries at once (see eval_all and mark_all).
+    :param agents: List of agents. assumption: for each agent: agent.eval(0, agent.cake_length()) == 1
+    :param epsilon: A bound
+    :return: a generator of the cut positions, from 0 to the cake length.
+
+    >>> a = PiecewiseConstantAgent([0.2, 0.4, 0.4])
+    >>> points = discretization_points([a], 0.2)
+    >>> next(points), next(points), next(points)
+    (0, 1.0, 1.5)
+    >>> [round(i,3) for i in get_players_valuation([a], discretization_points([a], 0.2))[0]]
+    [0.2, 0.2, 0.2, 0.2, 0.2]
+    """
     size_of_the_cake = max([agent.cake_length() for agent in agents])
     a = 0
-    C = [0]
-    condition = [agent.eval(a,size_of_the_cake) > epsilon for agent in agents]
-    while any(condition):
-        values = []
-        for i in agents:
-            x = i.mark(a, epsilon)
-            if (x != None):
-                values.append(x)
-        b = min(values)
-        C.append(b)
-        a = b
-        condition = [agent.eval(a, size_of_the_cake) > epsilon for agent in agents]
-    C.append(size_of_the_cake)
-    return C
-
-
-
-def get_players_valuation(agents: List[Agent], c : List[float]):
+    yield a
+    while np.any(eval_all(agents, a, size_of_the_cake) > epsilon):
+        # agents whose remaining value is smaller than epsilon return NaN, which is ignored by nanmin.
+        a = float(np.nanmin(mark_all(agents, a, epsilon)))
+        yield a
+    yield size_of_the_cake
+
+
+def get_players_valuation(agents: List[Agent], c : List[float], dtype=float, filename:str=None)->np.ndarray:
     """
     this function calculates for each player its valuation of a discrete cut of the cake.
-    for each player, it calulates the valuation of each item.
+    for each player, it calulates the valuation of each item, using a single batch query.
     :param agents: list of players
-    :param c: list of item, the discrete approximation version of the cake
-    :return: a matrix with all the valuations
+    :param c: list of item, the discrete approximation version of the cake (may also be a generator, e.g. discretization_points)
+    :param dtype: the type of the matrix entries; e.g. np.float32 halves the memory.
+    :param filename: if given, the matrix is an np.memmap backed by this file, so it does not have to fit in memory.
+                     it can be reopened later with np.memmap(filename, dtype, mode='r', shape=(num_of_agents, num_of_items)).
+    :return: a matrix (a 2-D ndarray) with all the valuations
 
     note: the i row in the matrix represents the valuations of player i
     len(matrix[i]) == number of items
@@ -87,16 +99,28 @@ def get_players_valuation(agents: List[Agent], c : List[float]):
     >>> b = PiecewiseConstantAgent([0.3, 0.5, 0.2])
     >>> c = [0,1,2,3]
     >>> get_players_valuation(agents, c)[0]
-    [0.25, 0.5, 0.25]
+    array([0.25, 0.5 , 0.25])
     >>> get_players_valuation(agents, c)[1]
-    [0.23, 0.7, 0.07]
+    array([0.23, 0.7 , 0.07])
+    >>> get_players_valuation(agents, c, dtype=np.float32).dtype
+    dtype('float32')
+
+    >>> import os, tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), "valuations.dat")
+    >>> matrix = get_players_valuation(agents, c, filename=filename)
+    >>> np.memmap(filename, dtype=float, mode='r', shape=(2,3))[1]
+    memmap([0.23, 0.7 , 0.07])
     """
-
-
-    matrix = []
-    for agent in agents:
-        valuations = [agent.eval(c[i], c[i + 1]) for i in range(len(c) - 1)]
-        matrix.append(valuations)
+    c = c if isinstance(c, np.ndarray) else np.fromiter(c, dtype=float)
+    shape = (len(agents), len(c) - 1)
+    if filename is None:
+        matrix = np.empty(shape, dtype=dtype)
+    else:
+        matrix = np.memmap(filename, dtype=dtype, mode='w+', shape=shape)
+    for (i, agent) in enumerate(agents):
+        matrix[i] = agent.eval_many(c[:-1], c[1:])
+    if filename is not None:
+        matrix.flush()
     return matrix
 
 def aprox_v(s:int ,t:int ,k:int,matrix: List[List[float]]):
@@ -193,38 +217,107 @@ def V_without_k(s:int ,t:int , current_s:List[int] , current_t:List[int], matrix
     return sum
 
 
-def maximize_expression(t:int , num_of_players:int , S:List[int], T:List[int], matrix:List[List[float]]):
+def prefix_sums(matrix: List[List[float]])->np.ndarray:
+    """
+    calculates, for each player, the prefix sums of its valuations of the items,
+    so that the value of any sequence of items is the difference of two entries.
+    :param matrix: all the valuations of the players
+    :return: a matrix P such that P[k][i] == the value of items 0,...,i-1 according to player k
+
+    >>> prefix_sums([[1,2,3,4,5,6], [4,5,1,2,3, 0]])
+    array([[ 0.,  1.,  3.,  6., 10., 15., 21.],
+           [ 0.,  4.,  9., 10., 12., 15., 15.]])
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    return np.concatenate((np.zeros((len(matrix), 1)), np.cumsum(matrix, axis=1)), axis=1)
+
+
+def item_owners(S:List[int], T:List[int], num_of_items:int)->np.ndarray:
+    """
+    :return: an array whose i-th element is the player who obtains item i (-1 if nobody obtains it).
+
+    >>> item_owners([0, 4], [3, 5], 7)
+    array([ 0,  0,  0,  0,  1,  1, -1])
+    """
+    owners = np.full(num_of_items, -1)
+    for (player, (first, last)) in enumerate(zip(S, T)):
+        if first != -1:
+            owners[first:last + 1] = player
+    return owners
+
+
+def owned_prefix_sums(owners:np.ndarray, matrix:np.ndarray)->np.ndarray:
+    """
+    :param owners: the owner of each item (see item_owners).
+    :param matrix: all the valuations of the players, as an array.
+    :return: an array P such that P[i] == the value of items 0,...,i-1, each according to the player who obtains it.
+
+    >>> owned_prefix_sums(np.array([0, 0, 1, -1]), np.array([[1., 2, 3, 4], [5, 6, 7, 8]]))
+    array([ 0.,  1.,  3., 10., 10.])
+    """
+    items = np.arange(len(owners))
+    owned_values = np.where(owners >= 0, matrix[np.maximum(owners, 0), items], 0)
+    return np.concatenate(([0], np.cumsum(owned_values)))
+
+
+def maximize_expression(t:int , num_of_players:int , S:List[int], T:List[int], matrix:List[List[float]], prefix:np.ndarray=None, owned_prefix:np.ndarray=None):
     """
     because of the factor 2, the algorithm gives only approximation
     this function maximizes the expression:
     aprox_v(s, t, k, matrix) - 2*(aprox_v(S[k], T[k], k, matrix) + V(s,t,S,matrix))
 
+    all the values are calculated at once, as a (num_of_players x (t+1)) matrix, using the prefix sums of the valuations.
+
     :param t: the last item
     :param num_of_players: number of players
     :param S: a list such that S[i] == which item {0,...,(num_of_items - 1)} is the first item of player i
     :param T: a list such that T[i] == which item {0,...,(num_of_items - 1)} is the last item of player i
     :param matrix: all the valuations of the players
+    :param prefix: the prefix sums of the valuations (see prefix_sums). If None, they are calculated from the matrix.
+    :param owned_prefix: the prefix sums of the values of the items to their owners (see owned_prefix_sums).
+                         If None, they are calculated from S and T.
     :return: params k' and s' that maximize the expression
 
+    >>> matrix = [[1,2,3,4,5,6], [4,5,1,2,3, 0]]
+    >>> maximize_expression(3, 2, [-1,-1], [-1,-1], matrix)
+    [12.0, 1, 0]
+    >>> maximize_expression(3, 2, [0,-1], [3,-1], matrix)
+    [-6.0, 1, 3]
+    >>> maximize_expression(5, 2, [0,4], [3,5], matrix)
+    [-3.0, 1, 4]
     """
-    max = -sys.maxsize - 1
-    k_tag = 0
-    s_tag = 0
-    for k in range(num_of_players):
-        for s in range(t + 1):
-            v1 = aprox_v(s,t,k,matrix)  #the value of items s to t according to player k
-            v2 = aprox_v(S[k], T[k], k, matrix)   #the value of items player k currently own
-            v3 = V_without_k(s,t,S,T,matrix, k)   #the value of  all the parts from s to t that other players than k obtain
-            net_value = v1 - 2 * (v2 + v3)   #value = aprox_v(s, t, k, matrix) - 2*(aprox_v(S[k], T[k], k, matrix) + V(s,t,S,matrix))
-            logger.debug("Moving items %d..%d to player %d gains %f but loses %f+%f. Value-2cost=%f", s,t,k, v1,v2,v3,net_value)
-            # logger.debug("The value of items player {} currently own = {}".format(k,v2))
-            # logger.debug("the value of  all the parts from {} to {} that other players than {} obtain = {}".format(s,t,k,v3))
-            # logger.debug("Value minus twice the cost = {}".format(net_value))
-            if (net_value > max):
-                max = net_value
-                k_tag = k
-                s_tag = s
-    return [max, k_tag, s_tag]
+    if prefix is None:
+        prefix = prefix_sums(matrix)
+    players = np.arange(num_of_players)
+    S = np.asarray(S[:num_of_players])
+    T = np.asarray(T[:num_of_players])
+    owners = (S != -1)
+    s = np.arange(t + 1)
+
+    # v1[k,s] = the value of items s to t according to player k
+    v1 = prefix[players, t + 1][:, None] - prefix[:num_of_players, :t + 1]
+
+    # v2[k] = the value of items player k currently own
+    v2 = np.where(owners, prefix[players, T + 1] - prefix[players, np.maximum(S, 0)], 0)
+
+    # owned_prefix[i] = the value of items 0..i-1, each according to the player who obtains it (0 if nobody obtains it)
+    if owned_prefix is None:
+        num_of_items = len(prefix[0]) - 1
+        owned_prefix = owned_prefix_sums(item_owners(S, T, num_of_items), np.asarray(matrix, dtype=float))
+
+    # v3[k,s] = the value of all the parts from s to t that other players than k obtain:
+    # the value of all obtained parts from s to t, minus the value of the parts that k obtains.
+    lows = np.maximum(s[None, :], S[:, None])
+    highs = np.minimum(T, t)[:, None]
+    own = np.where(owners[:, None] & (lows <= highs),
+        prefix[players[:, None], np.minimum(highs, t) + 1] - prefix[players[:, None], np.minimum(lows, t)], 0)
+    v3 = (owned_prefix[t + 1] - owned_prefix[:t + 1])[None, :] - own
+
+    net_values = v1 - 2 * (v2[:, None] + v3)   #value = aprox_v(s, t, k, matrix) - 2*(aprox_v(S[k], T[k], k, matrix) + V(s,t,S,matrix))
+    (k_tag, s_tag) = np.unravel_index(np.argmax(net_values), net_values.shape)
+    logger.debug("Moving items %d..%d to player %d gains %f but loses %f+%f. Value-2cost=%f",
+        s_tag, t, k_tag, v1[k_tag, s_tag], v2[k_tag], v3[k_tag, s_tag], net_values[k_tag, s_tag])
+    return [float(net_values[k_tag, s_tag]), int(k_tag), int(s_tag)]
 
 
 def  discrete_utilitarian_welfare_approximation(matrix: List[List[float]], items:List[float]):
@@ -248,15 +341,25 @@ def  discrete_utilitarian_welfare_approximation(matrix: List[List[float]], items
     num_of_items = len(items) - 1
     S = [-1] * num_of_players
     T = [-1] * num_of_players
+    prefix = prefix_sums(matrix)
+    values = np.asarray(matrix, dtype=float)
+    # the owner of each item, and the prefix sums of the values of the items to their owners; updated with S and T.
+    owners = np.full(num_of_items, -1)
+    owned_prefix = np.zeros(num_of_items + 1)
 
     #the main loop of the algorithm
     for t in range(0, num_of_items):
         logger.debug("------Iteration %d------",t)
-        maximum = maximize_expression(t, num_of_players, S, T, matrix)
+        maximum = maximize_expression(t, num_of_players, S, T, matrix, prefix, owned_prefix)
         logger.debug("Max net value is %f, for player k'=%d, s'=%f.\n", maximum[0], maximum[1], maximum[2])
         while maximum[0] >= 0:
             k_tag = maximum[1]
             s_tag = maximum[2]
+            # k' gives up its items and gets s'..t; all the other changes below are inside s'..t.
+            if S[k_tag] != -1:
+                owners[S[k_tag]:T[k_tag] + 1] = -1
+            owners[s_tag:t + 1] = k_tag
+            owned_prefix = owned_prefix_sums(owners, values)
             for i in range(num_of_players):
                 if(S[i] >= s_tag):
                     S[i] = -1
@@ -267,7 +370,7 @@ def  discrete_utilitarian_welfare_approximation(matrix: List[List[float]], items
                 if (S[i] < s_tag and s_tag <= T[i]):
                     T[i] = s_tag - 1
 
-            maximum = maximize_expression(t, num_of_players, S, T, matrix)
+            maximum = maximize_expression(t, num_of_players, S, T, matrix, prefix, owned_prefix)
 
     return [S,T]
 
@@ -7,9 +7,10 @@ Programmer: Erel Segal-Halevi
 Since: 2019-12
 """
 
-from agents import *
+from fairpy.agents import *
 
-import last_diminisher, logging, sys
+from fairpy import last_diminisher
+import logging, sys
 
 last_diminisher.logger.addHandler(logging.StreamHandler(sys.stdout))
 last_diminisher.logger.setLevel(logging.INFO)
@@ -9,10 +9,10 @@ Since: 2019-11
 import sys
 if __name__ == "__main__" and (len(sys.argv) < 2 or sys.argv[1] != "quiet"):
 
-    from agents import *
+    from fairpy.agents import *
     import matplotlib.pyplot as pyplot
 
-    import partition_simplex
+    from fairpy import partition_simplex
     import logging, sys
     partition_simplex.logger.addHandler(logging.StreamHandler(sys.stdout))
     partition_simplex.logger.setLevel(logging.INFO)
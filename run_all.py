@@ -1,11 +1,132 @@
 #!python3
-# Run all the programs (doctests and demos) in the current folder.
+# Run all the programs (doctests and demos) in the current folder and in the fairpy package, in parallel.
+#
+# Each module is imported in a worker process (which runs the top-level code of the demos) and then its doctests are run.
+# Each module gets a fresh worker (on Python 3.11+), so that state left by one module, e.g. logging handlers
+# that a demo binds to its captured output, cannot affect the next one. On older versions the workers are reused,
+# and the logging handlers and levels are restored after each module.
+#
+# Usage:  python run_all.py [--only PATTERN ...] [--skip PATTERN ...] [-j JOBS] [-v]
 
-import glob, importlib, os, sys
+import argparse, doctest, fnmatch, glob, importlib.util, io, logging, os, sys, time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
 
-for file in glob.iglob("*.py"):
-    if "run_all" in file:
-        continue
-    print("\n\nProcessing "+file)
-    command = '"'+sys.executable+'"'+" "+file+" quiet"
-    os.system(command)
+FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+def init_worker():
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    if FOLDER not in sys.path:
+        sys.path.insert(0, FOLDER)
+
+
+def run_module(file: str) -> dict:
+    """
+    Import the given file as a module and run its doctests.
+    :return: a dict with the number of doctests and failures, the wall time, and the captured output.
+    """
+    name = module_name(file)
+    output = io.StringIO()
+    loggers = [logging.getLogger()] + [logging.getLogger(logger_name) for logger_name in list(logging.Logger.manager.loggerDict)]
+    saved_loggers = [(logger, list(logger.handlers), logger.level) for logger in loggers]
+    (saved_argv, sys.argv) = (sys.argv, [file, "quiet"])
+    start_time = time.perf_counter()
+    result = {"module": name, "tests": 0, "failures": 0, "error": None}
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            if "." in name:   # a module of the package
+                module = importlib.import_module(name)
+            else:             # a demo or a script
+                spec = importlib.util.spec_from_file_location(name, file)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[name] = module
+                spec.loader.exec_module(module)
+            runner = doctest.DocTestRunner(optionflags=doctest.ELLIPSIS)
+            for test in doctest.DocTestFinder().find(module, name):
+                runner.run(test, out=output.write)
+            (result["failures"], result["tests"]) = runner.summarize(verbose=False)
+    except BaseException:
+        result["error"] = traceback.format_exc()
+    finally:
+        sys.argv = saved_argv
+        restore_loggers(saved_loggers)
+    result["seconds"] = time.perf_counter() - start_time
+    result["output"] = output.getvalue()
+    return result
+
+
+def restore_loggers(saved_loggers: list):
+    """
+    Restore the handlers and levels of the loggers that existed before a module ran,
+    and remove the handlers that the module added to new loggers.
+    """
+    saved = {id(logger) for (logger, handlers, level) in saved_loggers}
+    for (logger, handlers, level) in saved_loggers:
+        logger.handlers[:] = handlers
+        logger.setLevel(level)
+    for logger in logging.Logger.manager.loggerDict.values():
+        if isinstance(logger, logging.Logger) and id(logger) not in saved:
+            logger.handlers.clear()
+
+
+def module_name(file: str) -> str:
+    """
+    :return: "fairpy.x" for the file fairpy/x.py, and "x" for the file x.py in this folder.
+    """
+    name = os.path.splitext(os.path.basename(file))[0]
+    folder = os.path.dirname(os.path.abspath(file))
+    return name if folder == FOLDER else os.path.basename(folder) + "." + name
+
+
+def select_files(only: list, skip: list) -> list:
+    files = sorted(glob.glob(os.path.join(FOLDER, "*.py"))) + sorted(glob.glob(os.path.join(FOLDER, "fairpy", "*.py")))
+    files = [file for file in files
+        if os.path.basename(file) not in (os.path.basename(__file__), "setup.py") and not os.path.basename(file).startswith("__")]
+    def matches(file, patterns):
+        names = (os.path.basename(file), os.path.splitext(os.path.basename(file))[0], module_name(file))
+        return any(fnmatch.fnmatch(name, pattern) for name in names for pattern in patterns)
+    if only:
+        files = [file for file in files if matches(file, only)]
+    if skip:
+        files = [file for file in files if not matches(file, skip)]
+    return files
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the doctests and demos of all modules in this folder.")
+    parser.add_argument("--only", nargs="+", default=[], metavar="PATTERN", help="run only modules matching these glob patterns")
+    parser.add_argument("--skip", nargs="+", default=[], metavar="PATTERN", help="skip modules matching these glob patterns")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="number of worker processes (default: all cores)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the output of every module, not only of failed ones")
+    args = parser.parse_args(argv)
+
+    files = select_files(args.only, args.skip)
+    start_time = time.perf_counter()
+    results = []
+    fresh_workers = {"max_tasks_per_child": 1} if sys.version_info >= (3, 11) else {}
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(files) or 1)), initializer=init_worker, **fresh_workers) as executor:
+        futures = [executor.submit(run_module, file) for file in files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            failed = result["error"] is not None or result["failures"] > 0
+            if failed or args.verbose:
+                print("\n\n===== Output of " + result["module"])
+                print(result["output"])
+                if result["error"] is not None:
+                    print(result["error"])
+
+    print("\n{:45} {:>6} {:>9} {:>9}  {}".format("module", "tests", "failures", "seconds", "status"))
+    for result in sorted(results, key=lambda result: result["module"]):
+        status = "ERROR" if result["error"] is not None else "FAIL" if result["failures"] > 0 else "ok"
+        print("{:45} {:>6} {:>9} {:>9.3f}  {}".format(result["module"], result["tests"], result["failures"], result["seconds"], status))
+    num_of_failed = sum(result["error"] is not None or result["failures"] > 0 for result in results)
+    print("\n{} modules, {} failed, {} tests, {} failures, {:.3f} seconds".format(
+        len(results), num_of_failed, sum(result["tests"] for result in results),
+        sum(result["failures"] for result in results), time.perf_counter() - start_time))
+    return 1 if num_of_failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
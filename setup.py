@@ -20,7 +20,16 @@ with open(path.join(here, 'README.md'), encoding='utf-8') as f:
 # with open(path.join(here, 'requirements.txt'), encoding='utf-8') as f:
 #     requirements = f.read().splitlines()
 #     requirements = [r for r in requirements if "git+" not in r]
-requirements = ["numpy","cvxpy","networkx","matplotlib"]
+requirements = ["numpy"]
+
+# Optional dependencies, loaded lazily only by the functions that need them.
+# To install with "pip install fairpy[plot]" or "pip install fairpy[all]".
+extra_requirements = {
+    "plot": ["matplotlib"],
+    "solvers": ["cvxpy","networkx"],
+    "fast": ["numba"],
+}
+extra_requirements["all"] = sorted(set(sum(extra_requirements.values(), [])))
 
 # Arguments marked as "Required" below must be included for upload to PyPI.
 # Fields marked as "Optional" may be commented out.
@@ -42,7 +51,7 @@ setup(
     # the `py_modules` argument instead as follows, which will expect a file
     # called `my_module.py` to exist:
     # py_modules=["agents","allocations","cut_and_choose","last_diminisher","partition_simplex"],
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
 
 
     # This field lists other packages that your project depends on to run.
@@ -52,17 +61,18 @@ setup(
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
     install_requires=requirements,         # Optional
+    extras_require=extra_requirements,     # Optional
 
     # To provide executable scripts, use entry points in preference to the
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # `pip` to create the appropriate form of executable for the target
     # platform.
     #
-    # For example, the following would provide a command called `sample` which
-    # executes the function `main` from this package when invoked:
-    # entry_points={  # Optional
-    #     'console_scripts': [
-    #         'sample=sample:main',
-    #     ],
-    # },
+    # The following provides a command called `fairpy` which
+    # executes the function `main` from fairpy/cli.py when invoked:
+    entry_points={  # Optional
+        'console_scripts': [
+            'fairpy=fairpy.cli:main',
+        ],
+    },
 )
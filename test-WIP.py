@@ -1,9 +1,9 @@
-from agents import *
-from allocations import *
+from fairpy.agents import *
+from fairpy.allocations import *
 from typing import *
 from numpy import argmax
-from cut_and_choose import asymmetric_protocol
-from normal_agent import *
+from fairpy.cut_and_choose import asymmetric_protocol
+from fairpy.normal_agent import *
 
 t = PiecewiseConstantAgent([1, 1, 1, 1], "t")
 